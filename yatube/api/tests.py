@@ -0,0 +1,245 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.user, cls.author = mixer.cycle(2).blend(User)
+        cls.auth = Client()
+        cls.auth.force_login(cls.user)
+        cls.group = mixer.blend(Group)
+        cls.posts = mixer.cycle(15).blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+            image=None,
+            thumbnail='',
+            variants='',
+        )
+        cls.comments = mixer.cycle(3).blend(
+            Comment,
+            post=cls.posts[0],
+            author=cls.user,
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def newest(self, count: int) -> list:
+        return [
+            post.pk
+            for post in sorted(
+                self.posts,
+                key=lambda post: (post.created, post.pk),
+                reverse=True,
+            )[:count]
+        ]
+
+    def test_feeds_follow_cursor(self) -> None:
+        """Проверяем, что ленты листаются курсором без пропусков."""
+        for client, name, args in (
+            (self.client, 'posts', ()),
+            (self.client, 'group_posts', (self.group.slug,)),
+            (self.client, 'profile_posts', (self.author.username,)),
+            (self.auth, 'follow_posts', ()),
+        ):
+            with self.subTest(name=name):
+                url = reverse(f'api:v1:{name}', args=args)
+                first = client.get(url, {'limit': 10}).json()
+                second = client.get(
+                    url,
+                    {'limit': 10, 'cursor': first['next']},
+                ).json()
+                self.assertEqual(
+                    [post['id'] for post in first['results']]
+                    + [post['id'] for post in second['results']],
+                    self.newest(15),
+                )
+                self.assertIsNone(second['next'])
+
+    def test_sparse_fields(self) -> None:
+        """Проверяем выбор полей параметром `fields`."""
+        response = self.client.get(
+            reverse('api:v1:posts'),
+            {'fields': 'id,author', 'limit': 1},
+        )
+        self.assertEqual(
+            response.json()['results'],
+            [{'id': self.newest(1)[0], 'author': self.author.username}],
+        )
+        response = self.client.get(
+            reverse('api:v1:posts'),
+            {'fields': 'id,password'},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_post_with_comments(self) -> None:
+        """Проверяем пост с первой страницей комментариев."""
+        post = self.posts[0]
+        data = self.client.get(
+            reverse('api:v1:post', args=(post.pk,)),
+            {'comment_fields': 'text'},
+        ).json()
+        self.assertEqual(data['post']['text'], post.text)
+        self.assertEqual(data['post']['group'], self.group.slug)
+        self.assertEqual(
+            sorted(comment['text'] for comment in data['comments']['results']),
+            sorted(comment.text for comment in self.comments),
+        )
+
+    def test_profile_and_group(self) -> None:
+        """Проверяем описания автора и группы."""
+        profile = self.client.get(
+            reverse('api:v1:profile', args=(self.author.username,)),
+        ).json()
+        self.assertEqual(profile['posts_count'], 15)
+        self.assertEqual(profile['followers_count'], 1)
+        group = self.client.get(
+            reverse('api:v1:group', args=(self.group.slug,)),
+            {'fields': 'title'},
+        ).json()
+        self.assertEqual(group, {'title': self.group.title})
+
+    def test_batch_lookup(self) -> None:
+        """Проверяем пакетный запрос постов с отсутствующими ключами."""
+        deleted = mixer.blend(Post, author=self.author, image=None).pk
+        Post.objects.filter(pk=deleted).delete()
+        ids = [self.posts[2].pk, deleted, self.posts[0].pk, 0]
+        response = self.client.get(
+            reverse('api:v1:posts_batch'),
+            {'ids': ','.join(map(str, ids)), 'fields': 'id,comments_count'},
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                'results': [
+                    {'id': self.posts[2].pk, 'comments_count': 0},
+                    {'id': self.posts[0].pk, 'comments_count': 3},
+                ],
+                'missing': [deleted, 0],
+            },
+        )
+
+    def test_batch_etag_follows_comments(self) -> None:
+        """Проверяем, что комментарий к посту пакета меняет его ETag."""
+        url = reverse('api:v1:posts_batch')
+        params = {'ids': f'{self.posts[1].pk},{self.posts[2].pk}'}
+        etag = self.client.get(url, params)['ETag']
+        Comment.objects.create(
+            post=self.posts[2],
+            author=self.user,
+            text='Новый',
+        )
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['results'][1]['comments_count'], 1)
+
+    @override_settings(API_BATCH_LIMIT=2)
+    def test_batch_limits(self) -> None:
+        """Проверяем отказ на слишком длинный или неверный список."""
+        for ids in ('1,2,3', '1,x'):
+            with self.subTest(ids=ids):
+                response = self.client.get(
+                    reverse('api:v1:posts_batch'),
+                    {'ids': ids},
+                )
+                self.assertEqual(
+                    response.status_code,
+                    HTTPStatus.BAD_REQUEST,
+                )
+
+    def test_errors(self) -> None:
+        """Проверяем ответы API на ошибки запроса."""
+        for client, url, params, status in (
+            (
+                self.client,
+                reverse('api:v1:post', args=(0,)),
+                {},
+                HTTPStatus.NOT_FOUND,
+            ),
+            (
+                self.client,
+                reverse('api:v1:group_posts', args=('missing',)),
+                {},
+                HTTPStatus.NOT_FOUND,
+            ),
+            (
+                self.client,
+                reverse('api:v1:posts'),
+                {'cursor': 'garbage'},
+                HTTPStatus.BAD_REQUEST,
+            ),
+            (
+                self.client,
+                reverse('api:v1:follow_posts'),
+                {},
+                HTTPStatus.UNAUTHORIZED,
+            ),
+        ):
+            with self.subTest(url=url, params=params):
+                response = client.get(url, params)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_etag(self) -> None:
+        """Проверяем ответ 304 на повторный запрос с ETag."""
+        url = reverse('api:v1:posts')
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(
+                url,
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            ).status_code,
+            HTTPStatus.NOT_MODIFIED,
+        )
+        mixer.blend(Post, author=self.author, image=None)
+        self.assertEqual(
+            self.client.get(
+                url,
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            ).status_code,
+            HTTPStatus.OK,
+        )
+
+    def test_etag_follows_comments(self) -> None:
+        """Проверяем, что новый комментарий меняет ETag лент API."""
+        urls = (
+            reverse('api:v1:posts'),
+            reverse('api:v1:group_posts', args=(self.group.slug,)),
+            reverse('api:v1:profile_posts', args=(self.author.username,)),
+            reverse('api:v1:follow_posts'),
+        )
+        etags = {url: self.auth.get(url)['ETag'] for url in urls}
+        Comment.objects.create(
+            post=self.posts[1],
+            author=self.user,
+            text='Новый',
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.auth.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_follow_requires_auth_before_etag(self) -> None:
+        """Проверяем, что гость получает 401, а не 304 по чужому ETag."""
+        url = reverse('api:v1:follow_posts')
+        etag = self.client.get(url).get('ETag')
+        self.assertIsNone(etag)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_payload_smaller_than_html(self) -> None:
+        """Проверяем, что ответ API заметно меньше HTML страницы."""
+        api = self.client.get(reverse('api:v1:posts'))
+        html = self.client.get(reverse('posts:index'))
+        self.assertLess(len(api.content) * 2, len(html.content))
@@ -0,0 +1,146 @@
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.db.models.query import QuerySet
+from django.http import Http404, HttpRequest, JsonResponse
+from django.views.decorators.http import require_safe
+
+from core.paginator import NEXT, InvalidCursor, decode_cursor, encode_key
+
+
+class InvalidParameter(ValueError):
+    """Параметр запроса к API задан неверно."""
+
+
+class Projection:
+    """Поля ответа API и пути к ним в ORM.
+
+    Строки читаются через `.values()` без создания объектов моделей,
+    а имена файлов из полей `files` превращаются в URL.
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[str, str],
+        files: Optional[Mapping[str, Storage]] = None,
+    ) -> None:
+        self.fields = dict(fields)
+        self.files = dict(files or {})
+
+    def names(self, request: HttpRequest, param: str = 'fields') -> List[str]:
+        """Возвращает поля из параметра `param` или все поля проекции."""
+        names = [
+            name.strip()
+            for name in request.GET.get(param, '').split(',')
+            if name.strip()
+        ]
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise InvalidParameter(
+                'Неизвестные поля: {}'.format(', '.join(sorted(unknown))),
+            )
+        return names or list(self.fields)
+
+    def values(
+        self,
+        queryset: QuerySet,
+        names: Iterable[str],
+        keys: Iterable[str] = (),
+    ) -> QuerySet:
+        """Ограничивает запрос столбцами полей `names` и ключами `keys`."""
+        return queryset.values(
+            *dict.fromkeys((*(self.fields[name] for name in names), *keys)),
+        )
+
+    def render(self, row: dict, names: Iterable[str]) -> Dict[str, object]:
+        """Переименовывает столбцы строки `.values()` в поля ответа."""
+        data = {}
+        for name in names:
+            value = row[self.fields[name]]
+            if name in self.files:
+                value = self.files[name].url(value) if value else None
+            data[name] = value
+        return data
+
+
+def page_size(request: HttpRequest) -> int:
+    """Возвращает размер страницы из параметра `limit`."""
+    try:
+        limit = int(request.GET.get('limit', settings.PAGINATION))
+    except ValueError:
+        raise InvalidParameter('Параметр limit должен быть числом')
+    return max(1, min(limit, settings.API_MAX_LIMIT))
+
+
+def read_cursor(request: HttpRequest) -> Optional[Tuple[object, int]]:
+    """Раскодирует курсор `cursor` в ключ `(created, id)` или None."""
+    cursor = request.GET.get('cursor')
+    if not cursor:
+        return None
+    direction, created, pk = decode_cursor(cursor)
+    if direction != NEXT:
+        raise InvalidCursor(cursor)
+    return created, pk
+
+
+def read_ids(request: HttpRequest) -> List[int]:
+    """Возвращает идентификаторы из параметра `ids` без повторов."""
+    try:
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk]
+    except ValueError:
+        raise InvalidParameter('Параметр ids должен быть списком чисел')
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > settings.API_BATCH_LIMIT:
+        raise InvalidParameter(
+            f'Можно запросить не больше {settings.API_BATCH_LIMIT} постов',
+        )
+    return ids
+
+
+def next_cursor(rows: List[dict], limit: int) -> Optional[str]:
+    """Возвращает курсор после последней строки полной страницы."""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_key(NEXT, last['created'], last['id'])
+
+
+def respond(data: dict, status: int = 200) -> JsonResponse:
+    """Отдаёт данные компактным JSON без экранирования кириллицы."""
+    return JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def api_view(view: Callable) -> Callable:
+    """Разрешает только чтение и отдаёт ошибки view в формате JSON."""
+
+    @require_safe
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return respond({'detail': 'Не найдено'}, 404)
+        except InvalidCursor:
+            return respond({'detail': 'Неверный курсор'}, 400)
+        except InvalidParameter as error:
+            return respond({'detail': str(error)}, 400)
+
+    return wrapper
+
+
+def api_login_required(view: Callable) -> Callable:
+    """Отвечает гостю 401 до вызова view и проверки условий кэша."""
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        if not request.user.is_authenticated:
+            return respond({'detail': 'Нужна авторизация'}, 401)
+        return view(request, *args, **kwargs)
+
+    return wrapper
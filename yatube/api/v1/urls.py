@@ -0,0 +1,25 @@
+from django.urls import path
+
+from api.v1 import views
+
+app_name = 'v1'
+
+urlpatterns = [
+    path('posts/', views.posts, name='posts'),
+    path('posts/batch/', views.posts_batch, name='posts_batch'),
+    path('posts/<int:pk>/', views.post, name='post'),
+    path(
+        'posts/<int:pk>/comments/',
+        views.post_comments,
+        name='comments',
+    ),
+    path('follow/posts/', views.follow_posts, name='follow_posts'),
+    path('groups/<slug:slug>/', views.group, name='group'),
+    path('groups/<slug:slug>/posts/', views.group_posts, name='group_posts'),
+    path('profiles/<str:username>/', views.profile, name='profile'),
+    path(
+        'profiles/<str:username>/posts/',
+        views.profile_posts,
+        name='profile_posts',
+    ),
+]
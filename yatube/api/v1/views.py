@@ -0,0 +1,272 @@
+from django.db.models.query import QuerySet
+from django.http import Http404, HttpRequest, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition
+
+from api.utils import (
+    Projection,
+    api_login_required,
+    api_view,
+    next_cursor,
+    page_size,
+    read_cursor,
+    read_ids,
+    respond,
+)
+from core.paginator import keyset
+from core.queries import query_budget
+from posts import conditions
+from posts.models import Comment, Group, Post, User
+from posts.timeline import TimelinePaginator
+
+POSTS = Projection(
+    {
+        'id': 'id',
+        'text': 'text',
+        'created': 'created',
+        'modified': 'modified',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+        'thumbnail': 'thumbnail',
+        'comments_count': 'comments_count',
+    },
+    files={
+        'image': Post._meta.get_field('image').storage,
+        'thumbnail': Post._meta.get_field('thumbnail').storage,
+    },
+)
+
+COMMENTS = Projection(
+    {
+        'id': 'id',
+        'text': 'text',
+        'created': 'created',
+        'author': 'author__username',
+    },
+)
+
+GROUPS = Projection(
+    {
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+        'posts_count': 'posts_count',
+    },
+)
+
+PROFILES = Projection(
+    {
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'posts_count': 'stats__posts_count',
+        'followers_count': 'stats__followers_count',
+        'following_count': 'stats__following_count',
+    },
+)
+
+# Столбцы, по которым строится курсор следующей страницы.
+KEYS = ('id', 'created')
+
+
+def feed(
+    request: HttpRequest,
+    queryset: QuerySet,
+    projection: Projection = POSTS,
+    param: str = 'fields',
+) -> dict:
+    """Возвращает страницу ленты после курсора из запроса.
+
+    Args:
+        request: Запрос с параметрами `cursor`, `limit` и `param`.
+        queryset: Записи ленты.
+        projection: Поля записей в ответе.
+        param: Параметр запроса со списком нужных полей.
+
+    Returns:
+        Записи страницы и курсор следующей страницы или None.
+    """
+    names = projection.names(request, param)
+    limit = page_size(request)
+    rows = list(
+        keyset(
+            projection.values(queryset, names, KEYS),
+            read_cursor(request),
+        )[: limit + 1],
+    )
+    return {
+        'results': [projection.render(row, names) for row in rows[:limit]],
+        'next': next_cursor(rows, limit),
+    }
+
+
+@query_budget(4)
+@api_view
+@condition(
+    **conditions.with_comments(
+        conditions.index_etag,
+        conditions.index_last_modified,
+    ),
+)
+def posts(request: HttpRequest) -> JsonResponse:
+    """Отдаёт страницу ленты всех постов."""
+    return respond(feed(request, Post.objects.all()))
+
+
+@query_budget(6)
+@api_view
+@condition(
+    etag_func=conditions.post_etag,
+    last_modified_func=conditions.post_last_modified,
+)
+def post(request: HttpRequest, pk: int) -> JsonResponse:
+    """Отдаёт пост и первую страницу его комментариев.
+
+    Поля комментариев выбираются параметром `comment_fields`.
+    """
+    names = POSTS.names(request)
+    row = get_object_or_404(POSTS.values(Post.objects.all(), names), pk=pk)
+    return respond(
+        {
+            'post': POSTS.render(row, names),
+            'comments': feed(
+                request,
+                Comment.objects.filter(post_id=pk),
+                COMMENTS,
+                'comment_fields',
+            ),
+        },
+    )
+
+
+def batch_etag(request: HttpRequest) -> str:
+    """Собирает ETag пакета из поколений комментариев его постов."""
+    return conditions.make_etag(
+        request,
+        'feed',
+        *(f'comments:{pk}' for pk in read_ids(request)),
+    )
+
+
+@query_budget(3)
+@api_view
+@condition(etag_func=batch_etag)
+def posts_batch(request: HttpRequest) -> JsonResponse:
+    """Отдаёт посты по списку идентификаторов `ids` одним запросом.
+
+    Посты возвращаются в порядке `ids`, а идентификаторы несуществующих
+    или удалённых постов перечисляются в `missing`.
+    """
+    ids = read_ids(request)
+    names = POSTS.names(request)
+    rows = {
+        row['id']: row
+        for row in POSTS.values(Post.objects.filter(pk__in=ids), names, KEYS)
+    }
+    return respond(
+        {
+            'results': [
+                POSTS.render(rows[pk], names) for pk in ids if pk in rows
+            ],
+            'missing': [pk for pk in ids if pk not in rows],
+        },
+    )
+
+
+@query_budget(5)
+@api_view
+@condition(
+    etag_func=conditions.post_etag,
+    last_modified_func=conditions.post_last_modified,
+)
+def post_comments(request: HttpRequest, pk: int) -> JsonResponse:
+    """Отдаёт страницу комментариев поста."""
+    if not Post.objects.filter(pk=pk).exists():
+        raise Http404
+    return respond(
+        feed(request, Comment.objects.filter(post_id=pk), COMMENTS),
+    )
+
+
+@query_budget(8)
+@api_view
+@api_login_required
+@condition(**conditions.with_comments(conditions.follow_etag))
+def follow_posts(request: HttpRequest) -> JsonResponse:
+    """Отдаёт страницу ленты подписок текущего пользователя."""
+    names = POSTS.names(request)
+    page = TimelinePaginator(
+        request.user,
+        page_size(request),
+        Post.objects.only(*KEYS),
+    ).page(request.GET.get('cursor'))
+    ids = [post.pk for post in page]
+    rows = {
+        row['id']: row
+        for row in POSTS.values(Post.objects.filter(pk__in=ids), names, KEYS)
+    }
+    return respond(
+        {
+            'results': [POSTS.render(rows[pk], names) for pk in ids],
+            'next': page.next_cursor or None,
+        },
+    )
+
+
+@query_budget(3)
+@api_view
+def group(request: HttpRequest, slug: str) -> JsonResponse:
+    """Отдаёт описание группы."""
+    names = GROUPS.names(request)
+    row = get_object_or_404(
+        GROUPS.values(Group.objects.all(), names),
+        slug=slug,
+    )
+    return respond(GROUPS.render(row, names))
+
+
+@query_budget(5)
+@api_view
+@condition(
+    **conditions.with_comments(
+        conditions.group_etag,
+        conditions.group_last_modified,
+    ),
+)
+def group_posts(request: HttpRequest, slug: str) -> JsonResponse:
+    """Отдаёт страницу ленты группы."""
+    group_id = get_object_or_404(
+        Group.objects.values_list('pk', flat=True),
+        slug=slug,
+    )
+    return respond(feed(request, Post.objects.filter(group_id=group_id)))
+
+
+@query_budget(3)
+@api_view
+def profile(request: HttpRequest, username: str) -> JsonResponse:
+    """Отдаёт профиль автора со счётчиками."""
+    names = PROFILES.names(request)
+    row = get_object_or_404(
+        PROFILES.values(User.objects.all(), names),
+        username=username,
+    )
+    return respond(PROFILES.render(row, names))
+
+
+@query_budget(5)
+@api_view
+@condition(
+    **conditions.with_comments(
+        conditions.profile_etag,
+        conditions.profile_last_modified,
+    ),
+)
+def profile_posts(request: HttpRequest, username: str) -> JsonResponse:
+    """Отдаёт страницу ленты автора."""
+    author_id = get_object_or_404(
+        User.objects.values_list('pk', flat=True),
+        username=username,
+    )
+    return respond(feed(request, Post.objects.filter(author_id=author_id)))
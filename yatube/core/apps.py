@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = 'core'
     verbose_name = 'ядро'
+
+    def ready(self) -> None:
+        import core.signals  # noqa: F401
@@ -0,0 +1,27 @@
+from time import time_ns
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+
+def get_version(name: str) -> int:
+    """Возвращает текущее поколение именованного набора ключей кэша."""
+    return cache.get_or_set(f'version:{name}', time_ns, None)
+
+
+def bump_version(name: str) -> None:
+    """Сдвигает поколение, делая устаревшими все ключи набора."""
+    try:
+        cache.incr(f'version:{name}')
+    except ValueError:
+        cache.set(f'version:{name}', time_ns(), None)
+
+
+def get_versions(names: Iterable[str]) -> Dict[str, int]:
+    """Возвращает поколения нескольких наборов ключей одним запросом."""
+    keys = {f'version:{name}': name for name in names}
+    versions = cache.get_many(keys)
+    missing = {key: time_ns() for key in keys if key not in versions}
+    cache.set_many(missing, None)
+    versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
@@ -0,0 +1,311 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_stats VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_stats SET entries = entries + 1, size = size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_stats SET entries = entries - 1, size = size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache BEGIN
+    UPDATE cache_stats SET size = size - OLD.size + NEW.size;
+END;
+"""
+
+UPSERT = """
+INSERT INTO cache (key, value, expires, accessed, size)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value,
+    expires = excluded.expires,
+    accessed = excluded.accessed,
+    size = excluded.size
+"""
+
+# Наибольшее число параметров в одном запросе SQLite.
+CHUNK_SIZE = 900
+
+# Как часто (в секундах) обновлять время последнего чтения записи.
+# Чтение свежей записи не пишет в файл и не ждёт блокировки записи.
+ACCESS_RESOLUTION = 60
+
+
+def chunked(items: List[str], size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:][:size]
+
+
+class SQLiteCache(BaseCache):
+    """Общий для всех процессов хоста кэш в файле SQLite.
+
+    Записи вытесняются по давности последнего чтения (LRU) при превышении
+    числа записей `MAX_ENTRIES` или суммарного размера `MAX_SIZE` в байтах.
+    Операции `add` и `incr` атомарны между процессами.
+    """
+
+    def __init__(self, location: str, params: Dict[str, Any]) -> None:
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._location = location
+        self._max_size = int(options.get('MAX_SIZE', 0))
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        self._local = threading.local()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if getattr(self._local, 'pid', None) != os.getpid():
+            db = sqlite3.connect(
+                self._location,
+                timeout=self._busy_timeout,
+                isolation_level=None,
+            )
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('PRAGMA synchronous = NORMAL')
+            db.executescript(SCHEMA)
+            self._local.db, self._local.pid = db, os.getpid()
+        return self._local.db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _key(self, key: str, version: Optional[int]) -> str:
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _row(
+        self,
+        key: str,
+        value: Any,
+        timeout: Any,
+        now: float,
+    ) -> tuple:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return (key, data, self.get_backend_timeout(timeout), now, len(data))
+
+    def _fetch(self, keys: List[str]) -> Dict[str, Any]:
+        now, found = time.time(), {}
+        for chunk in chunked(keys):
+            marks = ','.join('?' * len(chunk))
+            stale = []
+            for key, value, accessed in self._db.execute(
+                f'SELECT key, value, accessed FROM cache '
+                f'WHERE key IN ({marks}) '
+                'AND (expires IS NULL OR expires > ?)',
+                (*chunk, now),
+            ):
+                found[key] = pickle.loads(value)
+                if accessed < now - ACCESS_RESOLUTION:
+                    stale.append(key)
+            if stale:
+                self._db.execute(
+                    'UPDATE cache SET accessed = ? WHERE key IN ({})'.format(
+                        ','.join('?' * len(stale)),
+                    ),
+                    (now, *stale),
+                )
+        return found
+
+    def _cull(self, db: sqlite3.Connection) -> None:
+        entries, size = db.execute(
+            'SELECT entries, size FROM cache_stats',
+        ).fetchone()
+        if entries <= self._max_entries and not (
+            self._max_size and size > self._max_size
+        ):
+            return
+        db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        entries, size = db.execute(
+            'SELECT entries, size FROM cache_stats',
+        ).fetchone()
+        while entries > self._max_entries or (
+            self._max_size and size > self._max_size
+        ):
+            db.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (
+                    (
+                        max(1, entries // self._cull_frequency)
+                        if self._cull_frequency
+                        else entries
+                    ),
+                ),
+            )
+            entries, size = db.execute(
+                'SELECT entries, size FROM cache_stats',
+            ).fetchone()
+
+    def add(
+        self,
+        key: str,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> bool:
+        key = self._key(key, version)
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, now),
+            )
+            added = db.execute(
+                'INSERT INTO cache (key, value, expires, accessed, size) '
+                'VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO NOTHING',
+                self._row(key, value, timeout, now),
+            ).rowcount
+            self._cull(db)
+        return bool(added)
+
+    def get(
+        self,
+        key: str,
+        default: Any = None,
+        version: Optional[int] = None,
+    ) -> Any:
+        key = self._key(key, version)
+        return self._fetch([key]).get(key, default)
+
+    def get_many(
+        self,
+        keys: Iterable[str],
+        version: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        keys = {self._key(key, version): key for key in keys}
+        return {
+            keys[key]: value for key, value in self._fetch(list(keys)).items()
+        }
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> None:
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(
+        self,
+        data: Dict[str, Any],
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> List[str]:
+        now = time.time()
+        rows = [
+            self._row(self._key(key, version), value, timeout, now)
+            for key, value in data.items()
+        ]
+        if rows:
+            with self._transaction() as db:
+                db.executemany(UPSERT, rows)
+                self._cull(db)
+        return []
+
+    def touch(
+        self,
+        key: str,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> bool:
+        return bool(
+            self._db.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (
+                    self.get_backend_timeout(timeout),
+                    self._key(key, version),
+                    time.time(),
+                ),
+            ).rowcount,
+        )
+
+    def incr(
+        self,
+        key: str,
+        delta: int = 1,
+        version: Optional[int] = None,
+    ) -> int:
+        key = self._key(key, version)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f'Key `{key}` not found')
+            value = pickle.loads(row[0]) + delta
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            db.execute(
+                'UPDATE cache SET value = ?, size = ? WHERE key = ?',
+                (data, len(data), key),
+            )
+        return value
+
+    def has_key(self, key: str, version: Optional[int] = None) -> bool:
+        return (
+            self._db.execute(
+                'SELECT 1 FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self._key(key, version), time.time()),
+            ).fetchone()
+            is not None
+        )
+
+    def delete(self, key: str, version: Optional[int] = None) -> None:
+        self.delete_many([key], version)
+
+    def delete_many(
+        self,
+        keys: Iterable[str],
+        version: Optional[int] = None,
+    ) -> None:
+        keys = [self._key(key, version) for key in keys]
+        with self._transaction() as db:
+            for chunk in chunked(keys):
+                db.execute(
+                    'DELETE FROM cache WHERE key IN ({})'.format(
+                        ','.join('?' * len(chunk)),
+                    ),
+                    chunk,
+                )
+
+    def clear(self) -> None:
+        with self._transaction() as db:
+            db.execute('DELETE FROM cache')
+
+    def close(self, **kwargs) -> None:
+        """Соединения живут всё время процесса и не закрываются."""
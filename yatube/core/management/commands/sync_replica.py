@@ -0,0 +1,57 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в реплику через backup API.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--path',
+            help='Файл реплики вместо NAME из настроек её базы.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help=(
+                'Повторять копирование каждые столько секунд, '
+                'меньше REPLICA_PIN_SECONDS.'
+            ),
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=1024,
+            help='Сколько страниц копировать за один шаг.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        if (options['interval'] or 0) >= settings.REPLICA_PIN_SECONDS:
+            raise CommandError(
+                'Интервал должен быть меньше REPLICA_PIN_SECONDS, иначе '
+                'клиенты после записи будут читать отстающую реплику',
+            )
+        path = options['path']
+        if path is None:
+            if settings.REPLICA_DATABASE not in settings.DATABASES:
+                raise CommandError('Реплика не настроена')
+            path = settings.DATABASES[settings.REPLICA_DATABASE]['NAME']
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Основная база не SQLite')
+        source.ensure_connection()
+        while True:
+            target = sqlite3.connect(path)
+            try:
+                # Между шагами копирования писатели не блокируются.
+                source.connection.backup(target, pages=options['pages'])
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(f'Реплика {path} обновлена'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,82 @@
+from typing import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from core.queries import QueryBudgetExceeded, logger, record_queries
+from core.routers import reading_from_replica
+
+PIN_COOKIE = 'primary'
+
+
+class ReplicaMiddleware:
+    """Читает данные безопасных запросов из реплики базы.
+
+    После запроса, изменившего данные, клиент получает куку на
+    `REPLICA_PIN_SECONDS` секунд, и пока она жива, его запросы читают
+    основную базу: так пользователь сразу видит свои изменения, даже
+    если реплика ещё не догнала основную базу.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.REPLICA_DATABASE:
+            return self.get_response(request)
+        if request.method not in ('GET', 'HEAD'):
+            response = self.get_response(request)
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+            return response
+        if PIN_COOKIE in request.COOKIES:
+            return self.get_response(request)
+        with reading_from_replica():
+            return self.get_response(request)
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы каждого запроса к сайту и ищет N+1.
+
+    Бюджет view задаётся декоратором `core.queries.query_budget`, иначе
+    действует `QUERY_BUDGET`. Превышение бюджета и запросы одной формы,
+    выполненные `QUERY_REPEAT_LIMIT` и более раз, пишутся в лог с местом
+    вызова, а при `QUERY_BUDGET_STRICT` прерывают запрос исключением.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        request.query_budget = settings.QUERY_BUDGET
+        with record_queries() as log:
+            response = self.get_response(request)
+        response['X-Query-Count'] = str(len(log))
+        problems = log.problems(
+            request.query_budget,
+            settings.QUERY_REPEAT_LIMIT,
+        )
+        if problems:
+            message = '{} {}: {}'.format(
+                request.method,
+                request.path,
+                '; '.join(problems),
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request: HttpRequest, view, args, kwargs) -> None:
+        request.query_budget = getattr(
+            view,
+            'query_budget',
+            settings.QUERY_BUDGET,
+        )
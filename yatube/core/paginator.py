@@ -0,0 +1,219 @@
+from datetime import datetime
+from hashlib import md5
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.db.models.query import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from core.cache import bump_version, get_version
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def count_version_name(model) -> str:
+    return f'count:{model._meta.label_lower}'
+
+
+def invalidate_counts(model) -> None:
+    """Сбрасывает кэшированные числа объектов для запросов к модели."""
+    bump_version(count_version_name(model))
+
+
+def invalidate_feeds() -> None:
+    """Сбрасывает все закэшированные страницы лент."""
+    bump_version('feed')
+
+
+def get_cached_page(
+    paginator: Paginator,
+    number: Optional[str],
+    name: str,
+) -> Page:
+    """Возвращает страницу из кэша лент или строит и кэширует её.
+
+    Args:
+        paginator: Пагинатор ленты.
+        number: Номер страницы или курсор из запроса.
+        name: Имя ленты, уникальное для её запроса.
+
+    Returns:
+        Страница ленты.
+    """
+    key = 'feed:{}:{}:{}:{}'.format(
+        get_version('feed'),
+        name,
+        type(paginator).__name__,
+        md5(str(number).encode()).hexdigest(),
+    )
+    state = cache.get(key)
+    if state is None:
+        page = paginator.get_page(number)
+        state = {
+            attr: value
+            for attr, value in vars(page).items()
+            if attr != 'paginator'
+        }
+        state['object_list'] = list(page.object_list)
+        cache.set(key, state, settings.FEED_CACHE_TIMEOUT)
+        return page
+    page = paginator._get_page(state.pop('object_list'), 1, paginator)
+    vars(page).update(state)
+    return page
+
+
+class InvalidCursor(ValueError):
+    """Курсор страницы не удалось разобрать."""
+
+
+def encode_key(direction: str, created: datetime, pk: int) -> str:
+    """Кодирует ключ `(created, id)` позиции в ленте в непрозрачный токен."""
+    raw = f'{direction}|{created.isoformat()}|{pk}'
+    return urlsafe_base64_encode(raw.encode())
+
+
+def encode_cursor(direction: str, obj) -> str:
+    """Кодирует позицию объекта в ленте в непрозрачный токен."""
+    return encode_key(direction, obj.created, obj.pk)
+
+
+def decode_cursor(cursor: str) -> Tuple[str, object, int]:
+    """Раскодирует токен в направление, дату создания и ключ объекта."""
+    try:
+        direction, created, pk = (
+            urlsafe_base64_decode(cursor).decode().split('|')
+        )
+        created = parse_datetime(created)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+    if direction not in (NEXT, PREVIOUS) or created is None:
+        raise InvalidCursor(cursor)
+    return direction, created, pk
+
+
+def keyset(
+    queryset: QuerySet,
+    key: Optional[Tuple[object, int]],
+    direction: str = NEXT,
+    fields: Tuple[str, str] = ('created', 'pk'),
+) -> QuerySet:
+    """Ограничивает запрос объектами после ключа `(created, id)`.
+
+    Args:
+        queryset: Исходный запрос.
+        key: Дата создания и идентификатор граничного объекта или None.
+        direction: NEXT для более старых объектов, PREVIOUS для более новых.
+        fields: Имена полей даты создания и идентификатора в запросе.
+
+    Returns:
+        Запрос, упорядоченный по удалению от граничного объекта.
+    """
+    created_field, pk_field = fields
+    if direction == NEXT:
+        lookup, ordering = 'lt', (f'-{created_field}', f'-{pk_field}')
+    else:
+        lookup, ordering = 'gt', (created_field, pk_field)
+    if key is not None:
+        created, pk = key
+        queryset = queryset.filter(
+            Q(**{f'{created_field}__{lookup}': created})
+            | Q(**{created_field: created, f'{pk_field}__{lookup}': pk}),
+        )
+    return queryset.order_by(*ordering)
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу `(created, id)` без COUNT и OFFSET.
+
+    Каждая страница выбирается диапазонным запросом от курсора, поэтому
+    глубокие страницы стоят столько же, сколько первая.
+    """
+
+    keyset = True
+
+    def __init__(self, object_list: QuerySet, per_page: int) -> None:
+        super().__init__(
+            object_list.order_by('-created', '-pk'),
+            per_page,
+        )
+
+    def get_page(self, cursor: Optional[str]) -> Page:
+        """Возвращает страницу по курсору или первую при ошибке."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def page(self, cursor: Optional[str]) -> Page:
+        if not cursor:
+            return self._build(self._slice(None, NEXT, self.per_page + 1))
+        direction, created, pk = decode_cursor(cursor)
+        items = self._slice((created, pk), direction, self.per_page + 1)
+        if direction == NEXT:
+            return self._build(items, has_previous=True)
+        if len(items) <= self.per_page:
+            return self.page(None)
+        return self._build(
+            items[: self.per_page][::-1],
+            has_previous=True,
+            has_next=True,
+        )
+
+    def _slice(
+        self,
+        key: Optional[Tuple[object, int]],
+        direction: str,
+        limit: int,
+    ) -> list:
+        """Выбирает не больше `limit` объектов от ключа в направлении.
+
+        Подклассы переопределяют этот метод, чтобы читать ленту
+        из других источников.
+        """
+        return list(keyset(self.object_list, key, direction)[:limit])
+
+    def _build(
+        self,
+        items: list,
+        has_previous: bool = False,
+        has_next: Optional[bool] = None,
+    ) -> Page:
+        if has_next is None:
+            has_next = len(items) > self.per_page
+            items = items[: self.per_page]
+        page = self._get_page(items, 1, self)
+        page.next_cursor = (
+            encode_cursor(NEXT, items[-1]) if has_next and items else ''
+        )
+        page.previous_cursor = (
+            encode_cursor(PREVIOUS, items[0]) if has_previous and items else ''
+        )
+        return page
+
+
+class CachedCountPaginator(Paginator):
+    """Нумерованный пагинатор с кэшированным числом объектов.
+
+    Число объектов хранится в кэше под ключом из SQL-запроса и поколения
+    модели, которое сдвигается при сохранении и удалении её записей.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        query = self.object_list.query
+        key = 'paginator:count:{}:{}'.format(
+            get_version(count_version_name(query.model)),
+            md5(str(query).encode()).hexdigest(),
+        )
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, settings.PAGINATION_COUNT_TIMEOUT)
+        return count
@@ -0,0 +1,130 @@
+import logging
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+local = threading.local()
+
+# Списки параметров `IN` разной длины дают одну и ту же форму запроса.
+PARAMS_LIST = re.compile(r'\((?:%s, )*%s\)')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Запрос к сайту выполнил слишком много или повторяющиеся запросы."""
+
+
+def query_budget(count: int) -> Callable:
+    """Задаёт view наибольшее число SQL-запросов на один запрос к сайту.
+
+    Декоратор ставится самым внешним, чтобы атрибут видел
+    `QueryBudgetMiddleware`.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        view.query_budget = count
+        return view
+
+    return decorator
+
+
+def shape(sql: str) -> str:
+    """Возвращает форму запроса без учёта длины списков параметров."""
+    return PARAMS_LIST.sub('(%s...)', sql)
+
+
+def is_project_file(filename: str) -> bool:
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in filename
+        and filename != __file__
+    )
+
+
+def origin(frame) -> str:
+    """Находит строку шаблона и кода проекта, выполнившую запрос.
+
+    Ближайший узел шаблона берётся из кадра `Node.render_annotated`,
+    ближайшая строка кода - из первого кадра в файлах проекта.
+    """
+    template, code = None, None
+    while frame is not None and not (template and code):
+        node = frame.f_locals.get('self')
+        if (
+            template is None
+            and frame.f_code.co_name == 'render_annotated'
+            and getattr(node, 'token', None) is not None
+            and getattr(node, 'origin', None) is not None
+        ):
+            template = f'{node.origin.name}:{node.token.lineno}'
+        if code is None and is_project_file(frame.f_code.co_filename):
+            code = f'{frame.f_code.co_filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    return ', '.join(place for place in (template, code) if place) or '?'
+
+
+class QueryLog:
+    """Журнал SQL-запросов с формой и местом вызова каждого из них."""
+
+    def __init__(self) -> None:
+        self.queries: List[Tuple[str, str]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not getattr(local, 'ignored', False):
+            self.queries.append((shape(sql), origin(sys._getframe(1))))
+        return execute(sql, params, many, context)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def repeated(self, limit: int) -> Dict[str, Tuple[int, List[str]]]:
+        """Возвращает формы, выполненные не меньше `limit` раз.
+
+        Returns:
+            Словарь формы запроса в число повторов и места их вызова.
+        """
+        counts = Counter(sql for sql, _ in self.queries)
+        found = {}
+        for sql, place in self.queries:
+            if counts[sql] >= limit:
+                places = found.setdefault(sql, (counts[sql], []))[1]
+                if place not in places:
+                    places.append(place)
+        return found
+
+    def problems(self, budget: Optional[int], limit: int) -> List[str]:
+        """Описывает превышение бюджета и повторяющиеся запросы (N+1)."""
+        problems = []
+        if budget is not None and len(self) > budget:
+            problems.append(f'{len(self)} SQL-запросов при бюджете {budget}')
+        for sql, (count, places) in self.repeated(limit).items():
+            problems.append(f'{count} раз из {"; ".join(places)}: {sql}')
+        return problems
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryLog]:
+    """Записывает SQL-запросы текущего потока ко всем базам данных."""
+    log = QueryLog()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(log))
+        yield log
+
+
+@contextmanager
+def ignored() -> Iterator[None]:
+    """Не записывает запросы блока в журналы текущего потока."""
+    previous = getattr(local, 'ignored', False)
+    local.ignored = True
+    try:
+        yield
+    finally:
+        local.ignored = previous
@@ -0,0 +1,49 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+state = threading.local()
+
+# Приложения, которые всегда читаются из основной базы: сессия и
+# пользователь, только что вошедший на сайт, могут ещё не дойти
+# до реплики, и он окажется гостем.
+PRIMARY_APPS = ('auth', 'sessions')
+
+
+@contextmanager
+def reading_from_replica() -> Iterator[None]:
+    """Направляет чтения текущего потока в реплику внутри блока."""
+    previous = getattr(state, 'replica', False)
+    state.replica = True
+    try:
+        yield
+    finally:
+        state.replica = previous
+
+
+class ReplicaRouter:
+    """Роутер, отправляющий чтения безопасных запросов в реплику.
+
+    Реплика задаётся настройкой `REPLICA_DATABASE` и используется только
+    внутри `reading_from_replica`, кроме моделей `PRIMARY_APPS`. Запись
+    всегда идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        if getattr(state, 'replica', False):
+            return settings.REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs) -> None:
+    """Применяет `SQLITE_PRAGMAS` к новому соединению с SQLite.
+
+    WAL позволяет читать базу во время записи, а `busy_timeout`
+    заставляет писателей ждать блокировку вместо ошибки
+    `database is locked`.
+    """
+    del sender, kwargs
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,47 @@
+from hashlib import sha256
+from pathlib import PurePosixPath
+from typing import Optional
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище с именами файлов по хэшу их содержимого.
+
+    Файл `posts/photo.JPG` сохраняется как `posts/ab/cd/<sha256>.jpg`:
+    каталоги остаются небольшими, а одинаковые загрузки ложатся в один
+    файл, который повторно не записывается.
+    """
+
+    def save(
+        self,
+        name: Optional[str],
+        content,
+        max_length: Optional[int] = None,
+    ) -> str:
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        name = self.hashed_name(name, digest.hexdigest())
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    @staticmethod
+    def hashed_name(name: str, digest: str) -> str:
+        """Строит путь файла в каталоге `name` по хэшу содержимого."""
+        path = PurePosixPath(name)
+        return str(
+            path.parent
+            / digest[:2]
+            / digest[2:4]
+            / (digest + path.suffix.lower()),
+        )
@@ -0,0 +1,45 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from core import queries
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.BACKGROUND_WORKERS,
+    thread_name_prefix='background',
+)
+
+
+def call(func: Callable[..., Any], *args: Any) -> None:
+    """Выполняет задачу, записывая ошибки в лог вместо их проброса."""
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой', func)
+
+
+def work(func: Callable[..., Any], *args: Any) -> None:
+    """Выполняет задачу в потоке пула и закрывает его соединения с БД."""
+    try:
+        call(func, *args)
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func: Callable[..., Any], *args: Any) -> None:
+    """Ставит задачу в фоновый пул после фиксации текущей транзакции.
+
+    При `BACKGROUND_TASKS_EAGER` задача выполняется сразу в текущем
+    потоке, что нужно тестам. Её запросы, как и в пуле, не входят
+    в бюджет запроса к сайту.
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        with queries.ignored():
+            call(func, *args)
+        return
+    transaction.on_commit(lambda: executor.submit(work, func, *args))
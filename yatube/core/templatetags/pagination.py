@@ -0,0 +1,30 @@
+from django import template
+from django.conf import settings
+from django.core.paginator import Page
+
+register = template.Library()
+
+
+@register.filter
+def page_window(page: Page) -> range:
+    """Возвращает номера страниц в окне вокруг текущей страницы."""
+    width = settings.PAGINATION_WINDOW
+    return range(
+        max(1, page.number - width),
+        min(page.paginator.num_pages, page.number + width) + 1,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context: dict, **params) -> str:
+    """Строит строку запроса для ссылки на другую страницу ленты.
+
+    Параметры текущего запроса (например, строка поиска) сохраняются,
+    а номер страницы и курсор заменяются переданными значениями.
+    """
+    query = context['request'].GET.copy()
+    for name in ('page', 'cursor'):
+        query.pop(name, None)
+    for name, value in params.items():
+        query[name] = str(value)
+    return f'?{query.urlencode()}'
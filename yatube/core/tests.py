@@ -1,9 +1,43 @@
+import sqlite3
+import tempfile
+from contextlib import closing
 from http import HTTPStatus
+from io import StringIO
+from multiprocessing import get_context
+from pathlib import Path
+from unittest import mock
 
 from django.conf import settings
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import CommandError, call_command
+from django.db import connections, router
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from mixer.backend.django import mixer
 
+from core.cache_backend import SQLiteCache
+from core.middleware import (
+    PIN_COOKIE,
+    QueryBudgetMiddleware,
+    ReplicaMiddleware,
+)
+from core.queries import QueryBudgetExceeded, record_queries
 from core.utils import truncate
+from posts.models import Comment, Post
+
+
+def increment(location: str) -> None:
+    cache = SQLiteCache(location, {})
+    for _ in range(50):
+        cache.incr('counter')
 
 
 class UtilsTests(TestCase):
@@ -71,3 +105,237 @@ class CoreViewTest(TestCase):
                     template,
                     message,
                 )
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.location = str(Path(self.directory.name) / 'cache.sqlite3')
+        self.cache = SQLiteCache(self.location, {})
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_get_set_many(self) -> None:
+        """Проверяем пакетные запись и чтение."""
+        self.cache.set_many({'a': 1, 'b': [2]})
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']),
+            {'a': 1, 'b': [2]},
+            'Пакетное чтение возвращает неверные значения',
+        )
+
+    def test_shared_between_instances(self) -> None:
+        """Проверяем, что запись видна из другого экземпляра кэша."""
+        self.cache.set('key', 'value')
+        self.assertEqual(
+            SQLiteCache(self.location, {}).get('key'),
+            'value',
+            'Кэш не общий для экземпляров с одним файлом',
+        )
+
+    def test_expired_add(self) -> None:
+        """Проверяем, что add заменяет просроченную запись."""
+        self.cache.set('key', 'old', timeout=0)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'new'))
+        self.assertFalse(self.cache.add('key', 'newer'))
+        self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_incr_between_processes(self) -> None:
+        """Проверяем атомарность incr в нескольких процессах."""
+        self.cache.set('counter', 0)
+        context = get_context('fork')
+        processes = [
+            context.Process(target=increment, args=(self.location,))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(
+            self.cache.get('counter'),
+            200,
+            'Инкремент теряет обновления между процессами',
+        )
+
+    @mock.patch('core.cache_backend.ACCESS_RESOLUTION', -1)
+    def test_lru_eviction(self) -> None:
+        """Проверяем вытеснение давно не читанных записей."""
+        cache = SQLiteCache(
+            self.location,
+            {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 4}},
+        )
+        for key in 'abc':
+            cache.set(key, key)
+        cache.get('a')
+        cache.set('d', 'd')
+        self.assertEqual(
+            sorted(cache.get_many('abcd')),
+            ['a', 'c', 'd'],
+            'Вытеснена не самая давно прочитанная запись',
+        )
+
+    def test_get_without_write_lock(self) -> None:
+        """Проверяем, что чтение свежей записи не ждёт блокировки записи."""
+        cache = SQLiteCache(self.location, {'OPTIONS': {'BUSY_TIMEOUT': 0}})
+        cache.set('key', 'value')
+        with closing(sqlite3.connect(self.location)) as writer:
+            writer.execute('BEGIN IMMEDIATE')
+            self.assertEqual(
+                cache.get('key'),
+                'value',
+                'Чтение записи обновляет её при каждом обращении',
+            )
+
+    def test_expired_cull_uses_index(self) -> None:
+        """Проверяем, что просроченные записи ищутся по индексу."""
+        plan = self.cache._db.execute(
+            'EXPLAIN QUERY PLAN DELETE FROM cache WHERE expires <= ?',
+            (0,),
+        ).fetchall()
+        self.assertIn('cache_expires', str(plan))
+
+    def test_size_limit(self) -> None:
+        """Проверяем ограничение суммарного размера записей."""
+        cache = SQLiteCache(self.location, {'OPTIONS': {'MAX_SIZE': 4096}})
+        for number in range(10):
+            cache.set(number, 'x' * 1024)
+        self.assertLessEqual(
+            cache._db.execute('SELECT size FROM cache_stats').fetchone()[0],
+            4096,
+            'Размер кэша превышает ограничение',
+        )
+
+
+class SQLitePragmasTests(TestCase):
+    def test_pragmas(self):
+        """Проверяем настройки нового соединения с SQLite."""
+        default = connections['default']
+        db = type(default)(default.settings_dict)
+        expected = {
+            'synchronous': 1,
+            'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            'cache_size': settings.SQLITE_PRAGMAS['cache_size'],
+            'temp_store': 2,
+        }
+        try:
+            with db.cursor() as cursor:
+                for name, value in expected.items():
+                    with self.subTest(name=name):
+                        cursor.execute(f'PRAGMA {name}')
+                        self.assertEqual(cursor.fetchone()[0], value)
+        finally:
+            db.close()
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+        self.middleware = ReplicaMiddleware(
+            lambda request: HttpResponse(router.db_for_read(Post)),
+        )
+
+    def test_safe_requests_read_replica(self) -> None:
+        """Проверяем, что GET и HEAD читают из реплики."""
+        for method in ('get', 'head'):
+            with self.subTest(method=method):
+                response = self.middleware(getattr(self.factory, method)('/'))
+                self.assertEqual(response.content, b'replica')
+
+    def test_read_your_writes(self) -> None:
+        """Проверяем, что после записи клиент читает основную базу."""
+        response = self.middleware(self.factory.post('/'))
+        self.assertEqual(response.content, b'default')
+        self.assertEqual(
+            response.cookies[PIN_COOKIE]['max-age'],
+            settings.REPLICA_PIN_SECONDS,
+        )
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(self.middleware(request).content, b'default')
+
+    def test_auth_reads_primary(self) -> None:
+        """Проверяем, что сессии и пользователи читаются из основной базы."""
+        middleware = ReplicaMiddleware(
+            lambda request: HttpResponse(
+                ' '.join(
+                    router.db_for_read(model) for model in (Session, User)
+                ),
+            ),
+        )
+        response = middleware(self.factory.get('/'))
+        self.assertEqual(response.content, b'default default')
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_disabled(self) -> None:
+        """Проверяем, что без реплики чтения идут в основную базу."""
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(response.content, b'default')
+
+
+class SyncReplicaTests(TransactionTestCase):
+    def test_sync_replica(self) -> None:
+        """Проверяем, что команда копирует основную базу в файл реплики."""
+        mixer.blend(Post, image=None)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'replica.sqlite3'
+            call_command('sync_replica', path=str(path), stdout=StringIO())
+            with closing(sqlite3.connect(str(path))) as replica:
+                (count,) = replica.execute(
+                    'SELECT COUNT(*) FROM posts_post',
+                ).fetchone()
+        self.assertEqual(count, 1, 'Пост не скопирован в реплику')
+
+    def test_interval_below_pin_window(self) -> None:
+        """Проверяем отказ от интервала не меньше окна чтения после записи."""
+        with self.assertRaises(CommandError):
+            call_command(
+                'sync_replica',
+                interval=settings.REPLICA_PIN_SECONDS,
+                stdout=StringIO(),
+            )
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = mixer.blend(Post, image=None)
+        mixer.cycle(3).blend(Comment, post=cls.post)
+
+    def test_repeated_queries_point_to_template(self) -> None:
+        """Проверяем, что N+1 из шаблона указывает на его строку."""
+        template = Template(
+            '{% for comment in comments %}\n'
+            '{{ comment.author }}\n'
+            '{% endfor %}',
+        )
+        with record_queries() as log:
+            template.render(Context({'comments': Comment.objects.all()}))
+        ((count, places),) = log.repeated(3).values()
+        self.assertEqual(count, 3)
+        self.assertTrue(places[0].startswith('<unknown source>:2'), places)
+
+    def test_middleware_budget(self) -> None:
+        """Проверяем реакцию на превышение бюджета запросов."""
+
+        def view(request):
+            for _ in range(3):
+                Post.objects.filter(pk=self.post.pk).exists()
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(view)
+        request = RequestFactory().get('/')
+        with override_settings(QUERY_BUDGET=5):
+            with self.assertRaisesMessage(QueryBudgetExceeded, '3 раз'):
+                middleware(request)
+        with override_settings(
+            QUERY_BUDGET=2,
+            QUERY_REPEAT_LIMIT=10,
+            QUERY_BUDGET_STRICT=False,
+        ):
+            with self.assertLogs('core.queries', 'WARNING'):
+                response = middleware(request)
+        self.assertEqual(response['X-Query-Count'], '3')
@@ -1,15 +1,53 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TypeVar
+
 from django.conf import settings
-from django.core.paginator import Page, Paginator
+from django.core.paginator import Page
 from django.db.models.query import QuerySet
 from django.http import HttpRequest
 
+from core.paginator import (
+    CachedCountPaginator,
+    CursorPaginator,
+    get_cached_page,
+)
+
+# Размер пачки объектов для одного `bulk_create`.
+BATCH_SIZE = 500
+
+T = TypeVar('T')
+
+
+def batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Делит поток объектов на пачки по `size` штук."""
+    items = iter(items)
+    batch = list(islice(items, size))
+    while batch:
+        yield batch
+        batch = list(islice(items, size))
+
 
 def paginate(
     request: HttpRequest,
     queryset: QuerySet,
     count: int = settings.PAGINATION,
+    cache_name: Optional[str] = None,
 ) -> Page:
-    return Paginator(queryset, count).get_page(request.GET.get('page'))
+    """Возвращает страницу ленты для запроса.
+
+    Нумерованные страницы `?page=` считают посты через кэш, остальные
+    запросы обслуживает курсорный пагинатор `?cursor=`. Если передано
+    имя ленты, страница берётся из кэша лент.
+    """
+    if 'page' in request.GET:
+        paginator = CachedCountPaginator(queryset, count)
+        number = request.GET.get('page')
+    else:
+        paginator = CursorPaginator(queryset, count)
+        number = request.GET.get('cursor')
+    if cache_name is None:
+        return paginator.get_page(number)
+    return get_cached_page(paginator, number, cache_name)
 
 
 def truncate(text: str, count: int = settings.TRUNCATION) -> str:
@@ -1,14 +1,27 @@
 from django.contrib import admin
 
+from posts import search
 from posts.models import Comment, Follow, Group, Post
 from yatube.admin import BaseAdmin
 
 
+class FullTextSearchMixin:
+    """Ищет по индексу FTS5 вместо `LIKE` по полям `search_fields`."""
+
+    search_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.matching(queryset, self.search_index, search_term), False
+
+
 @admin.register(Post)
-class PostAdmin(BaseAdmin):
+class PostAdmin(FullTextSearchMixin, BaseAdmin):
     list_display = ('pk', 'text', 'created', 'author', 'group')
     list_editable = ('group',)
     search_fields = ('text',)
+    search_index = search.POST_INDEX
     list_filter = ('created',)
 
 
@@ -18,10 +31,11 @@ class GroupAdmin(BaseAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(BaseAdmin):
+class CommentAdmin(FullTextSearchMixin, BaseAdmin):
     list_display = ('author', 'text')
     list_editable = ('text',)
     search_fields = ('text',)
+    search_index = search.COMMENT_INDEX
     list_filter = ('created',)
 
 
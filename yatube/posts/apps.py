@@ -6,3 +6,6 @@ class PostsConfig(AppConfig):
 
     name = 'posts'
     verbose_name = 'управление постами пользователей'
+
+    def ready(self) -> None:
+        import posts.signals  # noqa: F401
@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta
+from hashlib import md5
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.db.models.functions import Coalesce
+from django.db.models.query import QuerySet
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.utils import timezone
+
+from core.cache import get_version, get_versions
+from posts.models import Post
+
+SECOND = timedelta(seconds=1)
+
+LATEST_CHANGE = 'changed:latest'
+
+
+def changed(prefix: str = '') -> Coalesce:
+    """Дата последнего изменения записи или её создания.
+
+    Для постов это выражение покрыто индексом `posts_post_changed_idx`,
+    поэтому его максимум SQLite находит одним поиском по индексу.
+    """
+    return Coalesce(f'{prefix}modified', f'{prefix}created')
+
+
+def get_last_modified(
+    queryset: QuerySet,
+    prefixes: Tuple[str, ...] = ('',),
+) -> Optional[datetime]:
+    """Возвращает последнюю дату создания или изменения записей.
+
+    Args:
+        queryset: Записи страницы.
+        prefixes: Префиксы путей к датам записей и связанных объектов.
+    """
+    dates = queryset.aggregate(
+        **{f'{prefix}changed': Max(changed(prefix)) for prefix in prefixes},
+    )
+    return max(filter(None, dates.values()), default=None)
+
+
+def generations_changed(*names: str) -> datetime:
+    """Возвращает время, когда поколения данных страницы стали текущими.
+
+    Время фиксируется при первом запросе после сдвига поколения и всегда
+    хотя бы на секунду, точность заголовка, позже всех ранее выданных.
+    Так `Last-Modified` меняется и после изменений, которых не видно
+    по датам записей: удаления постов и комментариев, переименования
+    группы или смены числа подписчиков.
+    """
+    versions = get_versions(names)
+    keys = {f'changed:{name}': name for name in names}
+    seen = cache.get_many([*keys, LATEST_CHANGE])
+    latest = seen.pop(LATEST_CHANGE, None)
+    stale = [
+        key
+        for key, name in keys.items()
+        if seen.get(key, (None,))[0] != versions[name]
+    ]
+    if stale:
+        now = timezone.now()
+        latest = max(now, latest + SECOND) if latest else now
+        fresh = {key: (versions[keys[key]], latest) for key in stale}
+        cache.set_many(
+            {**fresh, LATEST_CHANGE: latest},
+            settings.FEED_CACHE_TIMEOUT,
+        )
+        seen.update(fresh)
+    return max(when for _, when in seen.values())
+
+
+def last_modified(
+    queryset: QuerySet,
+    prefixes: Tuple[str, ...] = ('',),
+    versions: Tuple[str, ...] = ('feed',),
+) -> datetime:
+    """Возвращает дату для `Last-Modified` по записям и поколениям."""
+    return max(
+        filter(
+            None,
+            (
+                get_last_modified(queryset, prefixes),
+                generations_changed(*versions),
+            ),
+        ),
+    )
+
+
+def make_etag(request: HttpRequest, *versions: str) -> str:
+    """Собирает ETag из пользователя и поколений данных страницы."""
+    generations = get_versions(versions)
+    parts = (request.user.pk, *(generations[name] for name in versions))
+    return md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def with_comments(
+    etag_func: Callable[..., str],
+    last_modified_func: Optional[Callable[..., Optional[datetime]]] = None,
+) -> Dict[str, Callable]:
+    """Дополняет условия ленты поколением комментариев всех постов.
+
+    Нужно ответам с числом комментариев постов: счётчик меняется
+    `update()` без сигналов и не сдвигает поколение лент.
+
+    Returns:
+        Аргументы `etag_func` и `last_modified_func` для `condition`.
+    """
+
+    def etag(request: HttpRequest, *args, **kwargs) -> str:
+        parts = (etag_func(request, *args, **kwargs), get_version('comments'))
+        return md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+    def last_modified(
+        request: HttpRequest,
+        *args,
+        **kwargs,
+    ) -> Optional[datetime]:
+        if last_modified_func is None:
+            return None
+        return max(
+            filter(
+                None,
+                (
+                    last_modified_func(request, *args, **kwargs),
+                    generations_changed('comments'),
+                ),
+            ),
+        )
+
+    return {'etag_func': etag, 'last_modified_func': last_modified}
+
+
+def syndication_etag(request: HttpRequest, **kwargs) -> str:
+    """Собирает общий для всех читателей ETag ленты RSS или Atom.
+
+    Ссылки ленты абсолютные, поэтому в ETag входят схема и хост.
+    """
+    del kwargs
+    parts = (
+        request.scheme,
+        request.get_host(),
+        request.path,
+        get_version('feed'),
+    )
+    return md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def index_etag(request: HttpRequest) -> str:
+    return make_etag(request, 'feed')
+
+
+def index_last_modified(request: HttpRequest) -> Optional[datetime]:
+    del request
+    return last_modified(Post.objects.all())
+
+
+def group_etag(request: HttpRequest, slug: str) -> str:
+    del slug
+    return make_etag(request, 'feed')
+
+
+def group_last_modified(
+    request: HttpRequest,
+    slug: str,
+) -> Optional[datetime]:
+    del request
+    return last_modified(Post.objects.filter(group__slug=slug))
+
+
+def follow_etag(request: HttpRequest) -> str:
+    return make_etag(request, 'feed', f'follows:{request.user.username}')
+
+
+def profile_etag(request: HttpRequest, username: str) -> str:
+    return make_etag(request, 'feed', f'follows:{username}')
+
+
+def profile_last_modified(
+    request: HttpRequest,
+    username: str,
+) -> Optional[datetime]:
+    del request
+    return last_modified(
+        Post.objects.filter(author__username=username),
+        versions=('feed', f'follows:{username}'),
+    )
+
+
+def post_etag(request: HttpRequest, pk: int) -> str:
+    return make_etag(request, 'feed', f'comments:{pk}')
+
+
+def post_detail_etag(request: HttpRequest, pk: int) -> str:
+    """Дополняет ETag поста CSRF-токеном формы комментария.
+
+    Токен сменяется при входе, и без него браузер после повторного
+    входа показал бы из кэша форму со старым токеном, отклоняемую 403.
+    """
+    etag = post_etag(request, pk)
+    if not request.user.is_authenticated:
+        return etag
+    get_token(request)
+    parts = (etag, request.META['CSRF_COOKIE'])
+    return md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def post_last_modified(request: HttpRequest, pk: int) -> Optional[datetime]:
+    del request
+    return last_modified(
+        Post.objects.filter(pk=pk),
+        ('', 'comments__'),
+        ('feed', f'comments:{pk}'),
+    )
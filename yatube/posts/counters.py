@@ -0,0 +1,76 @@
+from typing import Optional
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.query import QuerySet
+
+from core.utils import BATCH_SIZE, batches
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+def add(queryset: QuerySet, field: str, delta: int) -> int:
+    """Атомарно меняет счётчик выражением `F()`.
+
+    Счётчик не опускается ниже нуля: разошедшийся до пересчёта счётчик
+    иначе нарушил бы ограничение `CHECK` положительного поля.
+    """
+    value = F(field) + delta
+    if delta < 0:
+        value = Greatest(value, 0)
+    return queryset.update(**{field: value})
+
+
+def add_author_stat(user_id: int, field: str, delta: int) -> None:
+    """Меняет счётчик пользователя, создавая строку при её отсутствии."""
+    if not add(AuthorStats.objects.filter(user_id=user_id), field, delta):
+        if delta > 0:
+            recount_users(User.objects.filter(pk=user_id))
+
+
+def move_post(old_group_id: Optional[int], new_group_id: Optional[int]):
+    """Переносит пост между счётчиками групп."""
+    for group_id, delta in ((old_group_id, -1), (new_group_id, 1)):
+        if group_id:
+            add(Group.objects.filter(pk=group_id), 'posts_count', delta)
+
+
+def count_of(queryset: QuerySet, field: str) -> Coalesce:
+    """Возвращает подзапрос с числом записей, связанных по полю."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count'),
+        ),
+        0,
+    )
+
+
+def recount_users(users: QuerySet) -> None:
+    """Пересчитывает счётчики пользователей массовыми запросами."""
+    # `bulk_create` строит список из всех объектов, поэтому их
+    # передаём пачками: память не зависит от числа пользователей.
+    for batch in batches(
+        users.values_list('pk', flat=True).iterator(BATCH_SIZE),
+        BATCH_SIZE,
+    ):
+        AuthorStats.objects.bulk_create(
+            (AuthorStats(user_id=pk) for pk in batch),
+            ignore_conflicts=True,
+        )
+    AuthorStats.objects.filter(user__in=users).update(
+        posts_count=count_of(Post.objects.all(), 'author'),
+        followers_count=count_of(Follow.objects.all(), 'author'),
+        following_count=count_of(Follow.objects.all(), 'user'),
+    )
+
+
+def recount_all() -> None:
+    """Пересчитывает все счётчики, исправляя расхождения."""
+    recount_users(User.objects.all())
+    Group.objects.update(posts_count=count_of(Post.objects.all(), 'group'))
+    Post.objects.update(
+        comments_count=count_of(Comment.objects.all(), 'post'),
+    )
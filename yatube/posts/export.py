@@ -0,0 +1,143 @@
+import json
+from typing import Iterable, Iterator, List
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from django.db.models.query import QuerySet
+
+from posts.models import Comment, Follow, Post, User
+from posts.transfer import Encoder
+
+# Сколько строк читать из курсора базы за один раз.
+CHUNK_SIZE = 2000
+
+PROFILE_FIELDS = (
+    'username',
+    'first_name',
+    'last_name',
+    'email',
+    'date_joined',
+    'last_login',
+)
+
+
+class Buffer:
+    """Файловый объект только для записи, отдающий накопленные байты.
+
+    Не поддерживает `tell` и `seek`, поэтому `ZipFile` пишет архив
+    последовательно, с дескрипторами данных после каждого файла.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Данные остаются в буфере до вызова `drain`."""
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def drain(self) -> bytes:
+        """Возвращает записанные байты и очищает буфер."""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def json_lines(rows: Iterable[dict]) -> Iterator[bytes]:
+    """Кодирует записи в JSON-массив по одному элементу на строку."""
+    separator = b'[\n'
+    for row in rows:
+        yield separator + json.dumps(
+            row,
+            cls=Encoder,
+            ensure_ascii=False,
+        ).encode()
+        separator = b',\n'
+    yield b'[]\n' if separator == b'[\n' else b'\n]\n'
+
+
+def rows(queryset: QuerySet, *fields: str) -> Iterator[dict]:
+    """Читает записи курсором порциями, не создавая объектов моделей."""
+    return queryset.order_by('pk').values(*fields).iterator(CHUNK_SIZE)
+
+
+def documents(user: User) -> Iterator[tuple]:
+    """Возвращает имена JSON-файлов архива и их записи."""
+    yield 'profile.json', rows(
+        User.objects.filter(pk=user.pk),
+        *PROFILE_FIELDS,
+    )
+    yield 'posts.json', rows(
+        Post.objects.filter(author=user),
+        'id',
+        'text',
+        'created',
+        'modified',
+        'group__slug',
+        'image',
+    )
+    yield 'comments.json', rows(
+        Comment.objects.filter(author=user),
+        'id',
+        'post_id',
+        'text',
+        'created',
+        'modified',
+    )
+    yield 'follows.json', rows(
+        Follow.objects.filter(user=user),
+        'author__username',
+    )
+
+
+def export_archive(user: User) -> Iterator[bytes]:
+    """Собирает ZIP с данными пользователя по частям.
+
+    В архив попадают профиль, посты, комментарии и подписки в JSON
+    и исходные файлы картинок постов в каталоге `media/`. Записи
+    читаются курсором, файлы — блоками хранилища, а собранные байты
+    отдаются сразу, поэтому память не зависит от объёма данных.
+
+    Yields:
+        Очередные байты архива.
+    """
+    buffer = Buffer()
+    with ZipFile(buffer, 'w', ZIP_DEFLATED) as archive:
+        for name, records in documents(user):
+            with archive.open(name, 'w', force_zip64=True) as file:
+                for data in json_lines(records):
+                    file.write(data)
+                    if buffer:
+                        yield buffer.drain()
+        images = (
+            Post.objects.filter(author=user)
+            .exclude(image='')
+            .order_by('image')
+            .values_list('image', flat=True)
+            .distinct()
+            .iterator(CHUNK_SIZE)
+        )
+        storage = Post._meta.get_field('image').storage
+        for image in images:
+            try:
+                source = storage.open(image)
+            except FileNotFoundError:
+                continue
+            info = ZipInfo(f'media/{image}')
+            info.compress_type = ZIP_STORED
+            with source, archive.open(
+                info,
+                'w',
+                force_zip64=True,
+            ) as file:
+                for data in source.chunks():
+                    file.write(data)
+                    if buffer:
+                        yield buffer.drain()
+    if buffer:
+        yield buffer.drain()
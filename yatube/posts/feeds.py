@@ -0,0 +1,151 @@
+from datetime import datetime
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from core.queries import query_budget
+from posts import conditions
+from posts.models import Group, Post, User
+
+
+def cached_feed(
+    feed: Feed,
+    last_modified_func: Callable[..., Optional[datetime]],
+    budget: int,
+) -> Callable[..., HttpResponse]:
+    """Оборачивает ленту в условный GET и кэш готового ответа.
+
+    Ответ кэшируется под ETag ленты, поэтому XML собирается один раз
+    на изменение постов, а опрос без изменений получает 304.
+    """
+
+    @query_budget(budget)
+    @condition(
+        etag_func=conditions.syndication_etag,
+        last_modified_func=last_modified_func,
+    )
+    def view(request: HttpRequest, **kwargs) -> HttpResponse:
+        key = 'syndication:{}'.format(
+            conditions.syndication_etag(request, **kwargs),
+        )
+        response = cache.get(key)
+        if response is None:
+            response = feed(request, **kwargs)
+            cache.set(key, response, settings.FEED_CACHE_TIMEOUT)
+        return response
+
+    return view
+
+
+class IndexFeed(Feed):
+    """Лента RSS последних постов сайта."""
+
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов Yatube.'
+
+    def link(self) -> str:
+        return reverse('posts:index')
+
+    def items(self) -> QuerySet:
+        return self.posts(Post.objects.all())
+
+    def posts(self, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related('author', 'group').order_by(
+            '-created',
+            '-pk',
+        )[: settings.SYNDICATION_ITEMS]
+
+    def item_title(self, item: Post) -> str:
+        return str(item)
+
+    def item_description(self, item: Post) -> str:
+        return item.text
+
+    def item_link(self, item: Post) -> str:
+        return reverse('posts:post_detail', args=(item.pk,))
+
+    def item_author_name(self, item: Post) -> str:
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item: Post) -> datetime:
+        return item.created
+
+    def item_updateddate(self, item: Post) -> datetime:
+        return item.modified or item.created
+
+
+class GroupFeed(IndexFeed):
+    """Лента RSS последних постов группы."""
+
+    def get_object(self, request: HttpRequest, slug: str) -> Group:
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group: Group) -> str:
+        return f'Yatube: {group.title}'
+
+    def description(self, group: Group) -> str:
+        return group.description
+
+    def link(self, group: Group) -> str:
+        return reverse('posts:group_list', args=(group.slug,))
+
+    def items(self, group: Group) -> QuerySet:
+        return self.posts(Post.objects.filter(group=group))
+
+
+class ProfileFeed(IndexFeed):
+    """Лента RSS последних постов автора."""
+
+    def get_object(self, request: HttpRequest, username: str) -> User:
+        return get_object_or_404(User, username=username)
+
+    def title(self, author: User) -> str:
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author: User) -> str:
+        return f'Новые записи автора {author.username}.'
+
+    def link(self, author: User) -> str:
+        return reverse('posts:profile', args=(author.username,))
+
+    def items(self, author: User) -> QuerySet:
+        return self.posts(Post.objects.filter(author=author))
+
+
+class IndexAtomFeed(IndexFeed):
+    feed_type = Atom1Feed
+    subtitle = IndexFeed.description
+
+
+class GroupAtomFeed(GroupFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group: Group) -> str:
+        return self.description(group)
+
+
+class ProfileAtomFeed(ProfileFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author: User) -> str:
+        return self.description(author)
+
+
+index_rss = cached_feed(IndexFeed(), conditions.index_last_modified, 3)
+index_atom = cached_feed(IndexAtomFeed(), conditions.index_last_modified, 3)
+group_rss = cached_feed(GroupFeed(), conditions.group_last_modified, 4)
+group_atom = cached_feed(GroupAtomFeed(), conditions.group_last_modified, 4)
+profile_rss = cached_feed(ProfileFeed(), conditions.profile_last_modified, 4)
+profile_atom = cached_feed(
+    ProfileAtomFeed(),
+    conditions.profile_last_modified,
+    4,
+)
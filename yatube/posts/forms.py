@@ -1,5 +1,6 @@
 from django.forms import ModelForm
 
+from posts import media, thumbnails
 from posts.models import Comment, Post
 
 
@@ -8,6 +9,26 @@ class PostForm(ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.old_files = media.post_files(self.instance)
+
+    def save(self, commit: bool = True) -> Post:
+        """Сохраняет пост и заказывает миниатюру новой картинки.
+
+        Миниатюры заменённой картинки удаляются после фиксации
+        транзакции.
+        """
+        image_changed = 'image' in self.changed_data
+        if image_changed:
+            self.instance.thumbnail = ''
+            self.instance.variants = ''
+        post = super().save(commit)
+        if commit and image_changed:
+            media.delete_later(self.old_files)
+            thumbnails.schedule(post)
+        return post
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -0,0 +1,75 @@
+from io import BytesIO
+from typing import Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Форматы, в которых исходная картинка перезаписывается как есть,
+# и расширения файлов для них.
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+
+KEPT_FORMATS = tuple(EXTENSIONS)
+
+# Ключи `Image.info`, которые при сохранении не переносятся.
+METADATA = ('exif', 'icc_profile', 'xmp', 'XML:com.adobe.xmp', 'photoshop')
+
+ORIENTATION = 0x0112
+
+
+def load(file) -> Tuple[Image.Image, str, str, bool]:
+    """Декодирует картинку и приводит её к хранимому виду.
+
+    Поворачивает картинку по тегу EXIF Orientation, убирает метаданные
+    и уменьшает её так, чтобы длинная сторона не превышала
+    `POST_IMAGE_MAX_SIDE`.
+
+    Returns:
+        Картинку, формат и расширение файла для её сохранения и признак
+        того, что она отличается от исходного файла.
+    """
+    file.open('rb')
+    try:
+        image = Image.open(file)
+        image_format = image.format
+        changed = (
+            image_format not in KEPT_FORMATS
+            or image.getexif().get(ORIENTATION, 1) != 1
+            or any(key in image.info for key in METADATA)
+            or max(image.size) > settings.POST_IMAGE_MAX_SIDE
+        )
+        image = ImageOps.exif_transpose(image)
+    finally:
+        file.close()
+    if image_format not in KEPT_FORMATS:
+        image_format = 'JPEG'
+    image.info = {
+        key: value
+        for key, value in image.info.items()
+        if key == 'transparency'
+    }
+    limit = settings.POST_IMAGE_MAX_SIDE
+    image.thumbnail((limit, limit), Image.LANCZOS)
+    return image, image_format, EXTENSIONS[image_format], changed
+
+
+def encode(image: Image.Image, image_format: str) -> ContentFile:
+    """Кодирует картинку без метаданных EXIF, ICC и XMP."""
+    params = settings.POST_IMAGE_SAVE_OPTIONS.get(image_format, {})
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **params)
+    return ContentFile(buffer.getvalue())
+
+
+def crop(image: Image.Image, width: int) -> Image.Image:
+    """Вырезает из центра картинки кадр карточки заданной ширины."""
+    geometry_width, geometry_height = map(
+        int,
+        settings.POST_THUMBNAIL_GEOMETRY.split('x'),
+    )
+    size = (width, round(width * geometry_height / geometry_width))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    return ImageOps.fit(image, size, Image.LANCZOS)
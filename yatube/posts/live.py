@@ -0,0 +1,74 @@
+import json
+from time import monotonic, sleep
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.db.models.query import QuerySet
+
+from core.cache import get_version
+from posts.models import Follow, Post, User
+
+FEEDS = ('index', 'group', 'follow')
+
+
+def latest_post_id() -> int:
+    """Возвращает наибольший идентификатор поста из кэша.
+
+    Значение хранится под поколением лент и сбрасывается при любом
+    изменении постов, поэтому опрос без новых постов не трогает базу.
+    """
+    return cache.get_or_set(
+        'live:latest:{}'.format(get_version('feed')),
+        lambda: Post.objects.aggregate(latest=Max('pk'))['latest'] or 0,
+        settings.FEED_CACHE_TIMEOUT,
+    )
+
+
+def feed_posts(
+    feed: str,
+    slug: Optional[str] = None,
+    user: Optional[User] = None,
+) -> QuerySet:
+    """Возвращает посты ленты: всей, группы или подписок пользователя."""
+    posts = Post.objects.all()
+    if feed == 'group':
+        return posts.filter(group__slug=slug)
+    if feed == 'follow':
+        return posts.filter(
+            author__in=Follow.objects.filter(user=user).values('author'),
+        )
+    return posts
+
+
+def count_new(posts: QuerySet, since: int) -> Dict[str, int]:
+    """Считает посты ленты новее `since`, но не больше `NEW_POSTS_LIMIT`.
+
+    Returns:
+        Число новых постов и наибольший идентификатор поста на сайте.
+    """
+    latest = latest_post_id()
+    if since >= latest:
+        return {'count': 0, 'latest': latest}
+    count = posts.filter(pk__gt=since)[: settings.NEW_POSTS_LIMIT].count()
+    return {'count': count, 'latest': latest}
+
+
+def stream(posts: QuerySet, since: int) -> Iterator[str]:
+    """Отдаёт события SSE с числом новых постов при каждом его изменении.
+
+    Поток закрывается через `LIVE_STREAM_SECONDS`, после чего браузер
+    переподключается сам через `LIVE_POLL_INTERVAL` секунд.
+    """
+    deadline = monotonic() + settings.LIVE_STREAM_SECONDS
+    yield f'retry: {settings.LIVE_POLL_INTERVAL * 1000}\n\n'
+    last = None
+    while True:
+        state = count_new(posts, since)
+        if state != last:
+            yield f'data: {json.dumps(state)}\n\n'
+            last = state
+        if monotonic() >= deadline:
+            return
+        sleep(settings.LIVE_POLL_INTERVAL)
@@ -0,0 +1,49 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from sorl.thumbnail.conf import settings as thumbnail_settings
+
+from core.utils import batches
+from posts import media
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы картинок и миниатюр, на которые не ссылаются посты.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=400,
+            help='Сколько файлов проверять одним запросом к базе.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=60 * 60,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести пути файлов без их удаления.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        removed = 0
+        for directory, find in (
+            ('posts/', media.orphans),
+            (thumbnail_settings.THUMBNAIL_PREFIX, media.thumbnail_orphans),
+        ):
+            for batch in batches(
+                media.walk(directory, options['min_age']),
+                options['batch_size'],
+            ):
+                for name in find(batch):
+                    if options['dry_run']:
+                        self.stdout.write(name)
+                    else:
+                        default_storage.delete(name)
+                    removed += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Найдено забытых файлов: {removed}'),
+        )
@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from tqdm import tqdm
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает пользователей, группы, посты, комментарии '
+        'и подписки в файл JSONL.'
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            'path',
+            help='Файл для выгрузки или «-» для стандартного вывода.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за раз.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options['path'] == '-':
+            self.export(self.stdout, options)
+            return
+        with open(options['path'], 'w', encoding='utf-8') as file:
+            self.export(file, options)
+
+    def export(self, file, options) -> None:
+        total = 0
+        for model in transfer.MODELS:
+            rows = tqdm(
+                transfer.dump(model, options['chunk_size']),
+                desc=model._meta.label_lower,
+                unit=' rows',
+                file=sys.stderr,
+                disable=options['verbosity'] == 0,
+            )
+            for line in rows:
+                file.write(line + '\n')
+                total += 1
+        self.stderr.write(
+            self.style.SUCCESS(f'Выгружено записей: {total}'),
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры картинок постов, у которых их ещё нет.'
+
+    def handle(self, *args, **options) -> None:
+        pks = (
+            Post.objects.exclude(image='')
+            .filter(thumbnail='')
+            .values_list('pk', flat=True)
+        )
+        for pk in pks.iterator():
+            thumbnails.generate(pk)
+        self.stdout.write(self.style.SUCCESS('Миниатюры построены'))
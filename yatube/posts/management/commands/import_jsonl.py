@@ -0,0 +1,107 @@
+import os
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tqdm import tqdm
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает файл JSONL из export_jsonl пакетами '
+        'с возможностью продолжить после сбоя.'
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('path', help='Файл JSONL для загрузки.')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Сколько строк загружать в одной транзакции.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько строк вставлять одним запросом.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с номером последней загруженной строки '
+            '(по умолчанию <path>.checkpoint).',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать загрузку с начала, не читая контрольную точку.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        checkpoint = options['checkpoint'] or f'{options["path"]}.checkpoint'
+        start = 0 if options['restart'] else self.read_checkpoint(checkpoint)
+        chunk, loaded = defaultdict(list), 0
+        with open(options['path'], encoding='utf-8') as file:
+            lines = tqdm(
+                file,
+                initial=start,
+                unit=' rows',
+                file=sys.stderr,
+                disable=options['verbosity'] == 0,
+            )
+            with transfer.kept_timestamps():
+                for number, line in enumerate(lines, 1):
+                    if number <= start or not line.strip():
+                        continue
+                    try:
+                        obj = transfer.parse(line)
+                    except (ValueError, KeyError) as error:
+                        raise CommandError(
+                            f'Строка {number}: {error!r}',
+                        ) from error
+                    chunk[type(obj)].append(obj)
+                    loaded += 1
+                    if loaded % options['chunk_size'] == 0:
+                        self.save(chunk, options['batch_size'])
+                        self.write_checkpoint(checkpoint, number)
+                if chunk:
+                    self.save(chunk, options['batch_size'])
+        transfer.finish()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stderr.write(
+            self.style.SUCCESS(
+                f'Загружено записей: {loaded}. Пересоберите ленты '
+                'и миниатюры командами rebuild_timelines '
+                'и generate_thumbnails.',
+            ),
+        )
+
+    def save(self, chunk: dict, batch_size: int) -> None:
+        """Вставляет накопленные объекты одной транзакцией и очищает их.
+
+        Уже существующие строки пропускаются, поэтому повтор порции после
+        сбоя между фиксацией и записью контрольной точки безопасен.
+        """
+        with transaction.atomic():
+            for model in transfer.MODELS:
+                model._base_manager.bulk_create(
+                    chunk.pop(model, ()),
+                    batch_size=batch_size,
+                    ignore_conflicts=True,
+                )
+
+    def read_checkpoint(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as file:
+            return int(file.read().strip() or 0)
+
+    def write_checkpoint(self, path: str, number: int) -> None:
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(str(number))
+        os.replace(temporary, path)
@@ -0,0 +1,57 @@
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import delete as delete_thumbnails
+
+from posts import media
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Переносит картинки постов в хранилище с именами по хэшу.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов читать одним запросом.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        storage = Post._meta.get_field('image').storage
+        # Старые пути уже перенесённых файлов: их исходники удалены,
+        # а на них могут ссылаться посты следующих пачек.
+        renamed = {}
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .exclude(image='')
+                .order_by('pk')
+                .values_list('pk', 'image')[: options['batch_size']],
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            moved, posts = [], defaultdict(list)
+            for pk, name in batch:
+                if name not in renamed:
+                    if media.HASHED_NAME.search(name) or not (
+                        default_storage.exists(name)
+                    ):
+                        continue
+                    with default_storage.open(name) as file:
+                        renamed[name] = storage.save(name, file)
+                    moved.append(name)
+                posts[renamed[name]].append(pk)
+            # Посты обновляются по ключу: поле `image` не индексировано.
+            for new_name, pks in posts.items():
+                Post.objects.filter(pk__in=pks).update(image=new_name)
+            for name in moved:
+                delete_thumbnails(name)
+        media.recount_refs()
+        self.stdout.write(
+            self.style.SUCCESS(f'Перенесено картинок: {len(renamed)}'),
+        )
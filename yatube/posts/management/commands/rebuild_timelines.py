@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Follow, TimelineEntry
+
+
+class Command(BaseCommand):
+    help = 'Заново заполняет материализованные ленты подписок.'
+
+    def handle(self, *args, **options) -> None:
+        TimelineEntry.objects.all().delete()
+        follows = Follow.objects.select_related('user', 'author')
+        for follow in follows.iterator():
+            timeline.backfill(follow)
+        self.stdout.write(self.style.SUCCESS('Ленты подписок пересобраны'))
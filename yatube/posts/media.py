@@ -0,0 +1,156 @@
+import os
+import re
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, Q
+from sorl.thumbnail import default
+from sorl.thumbnail import delete as delete_thumbnails
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from core.tasks import run_in_background
+from core.utils import BATCH_SIZE, batches
+from posts import counters
+from posts.models import CARDS_DIR, Post, StoredImage
+
+# Вариант миниатюры назван по её JPEG: `<имя>_<ширина>.webp`.
+VARIANT_NAME = re.compile(
+    rf'^(?P<thumbnail>{re.escape(CARDS_DIR)}.+)_\d+\.webp$',
+)
+
+
+# Путь картинки в хранилище по хэшу: `<каталог>/ab/cd/abcd…<ext>`.
+HASHED_NAME = re.compile(r'/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.')
+
+
+def post_files(post: Post) -> List[str]:
+    """Возвращает пути миниатюры и её вариантов, построенных для поста."""
+    names = [post.thumbnail.name]
+    names.extend(line.rsplit(' ', 1)[0] for line in post.variants.splitlines())
+    return [name for name in names if name]
+
+
+def acquire(name: str) -> None:
+    """Учитывает новую ссылку поста на файл картинки."""
+    if name:
+        with transaction.atomic():
+            StoredImage.objects.select_for_update().get_or_create(name=name)
+            counters.add(StoredImage.objects.filter(name=name), 'refs', 1)
+
+
+def release(name: str) -> None:
+    """Снимает ссылку на файл и удаляет его, если ссылок не осталось.
+
+    Файл удаляется в фоне после фиксации транзакции. Файлы, загруженные
+    до учёта ссылок, остаются на месте до `collect_media`.
+    """
+    if name:
+        counters.add(StoredImage.objects.filter(name=name), 'refs', -1)
+        run_in_background(remove_unused, name)
+
+
+def remove_unused(name: str) -> None:
+    """Удаляет картинку со всеми её миниатюрами, если она не нужна.
+
+    Проверка ссылок и удаление записи — один запрос, поэтому ссылка,
+    появившаяся между ними, не оставит пост без файла.
+    """
+    with transaction.atomic():
+        deleted, _ = StoredImage.objects.filter(
+            name=name,
+            refs__lte=0,
+        ).delete()
+    if deleted:
+        delete_thumbnails(name)
+
+
+def remove(files: List[str]) -> None:
+    """Удаляет файлы из хранилища."""
+    for name in files:
+        default_storage.delete(name)
+
+
+def delete_later(files: List[str]) -> None:
+    """Удаляет файлы в фоне после фиксации транзакции.
+
+    Если транзакция откатится, файлы останутся на месте.
+    """
+    if files:
+        run_in_background(remove, files)
+
+
+def recount_refs() -> None:
+    """Пересчитывает ссылки постов на файлы картинок."""
+    StoredImage.objects.all().delete()
+    refs = (
+        Post.objects.exclude(image='')
+        .order_by()
+        .values('image')
+        .annotate(refs=Count('pk'))
+        .values_list('image', 'refs')
+        .iterator(BATCH_SIZE)
+    )
+    # Пачками, чтобы не держать в памяти записи всех картинок сразу.
+    for batch in batches(refs, BATCH_SIZE):
+        StoredImage.objects.bulk_create(
+            StoredImage(name=name, refs=count) for name, count in batch
+        )
+
+
+def walk(directory: str, min_age: float) -> Iterator[str]:
+    """Обходит каталог хранилища, выдавая файлы старше `min_age` секунд.
+
+    Пути выдаются относительно `MEDIA_ROOT` по одному, без построения
+    списка всех файлов каталога. Свежие файлы пропускаются, чтобы
+    не удалить загрузки, чья транзакция ещё не зафиксирована.
+    """
+    root = Path(default_storage.path(''))
+    deadline = time.time() - min_age
+    stack = [root / directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.stat().st_mtime < deadline:
+                    yield Path(entry.path).relative_to(root).as_posix()
+
+
+def owner(name: str) -> str:
+    """Возвращает путь, по которому пост ссылается на файл."""
+    match = VARIANT_NAME.match(name)
+    return f'{match["thumbnail"]}.jpg' if match else name
+
+
+def orphans(names: List[str]) -> List[str]:
+    """Отбирает из пачки файлы, на которые не ссылается ни один пост."""
+    owners = {name: owner(name) for name in names}
+    referenced = set()
+    for image, thumbnail in Post.objects.filter(
+        Q(image__in=set(owners.values()))
+        | Q(thumbnail__in=set(owners.values())),
+    ).values_list('image', 'thumbnail'):
+        referenced.update((image, thumbnail))
+    return [name for name in names if owners[name] not in referenced]
+
+
+def thumbnail_orphans(names: List[str]) -> List[str]:
+    """Отбирает миниатюры sorl-thumbnail, забытые хранилищем ключей."""
+    keys = {
+        add_prefix(ImageFile(name, default.storage).key): name
+        for name in names
+    }
+    referenced = KVStore.objects.filter(key__in=keys).values_list(
+        'key',
+        flat=True,
+    )
+    return sorted(set(names) - {keys[key] for key in referenced})
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='variants',
+            field=models.TextField(blank=True, editable=False, help_text='Строки «путь ширина» с вариантами миниатюры в WebP.', verbose_name='варианты миниатюры'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:23
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('user')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count'),
+        ),
+        0,
+    )
+
+
+def delete_duplicate_follows(apps, schema_editor):
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    Follow = apps.get_model('posts', 'Follow')
+    first = (
+        Follow.objects.values('user', 'author')
+        .annotate(first=Min('pk'), count=Count('pk'))
+        .filter(count__gt=1)
+    )
+    for follow in first:
+        Follow.objects.filter(
+            user=follow['user'],
+            author=follow['author'],
+        ).exclude(pk=follow['first']).delete()
+    AuthorStats.objects.update(
+        followers_count=count_of(Follow.objects.all(), 'author'),
+        following_count=count_of(Follow.objects.all(), 'user'),
+    )
+
+
+# Индекс по дате последнего изменения поста для Last-Modified лент.
+CHANGED_INDEX = (
+    'CREATE INDEX posts_post_changed_idx '
+    'ON posts_post (COALESCE(modified, created))'
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_stored_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_follows,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created'], name='posts_comment_post_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created', '-id'], name='posts_post_author_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-created', '-id'], name='posts_post_group_feed_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='posts_follow_unique_author'),
+        ),
+        migrations.RunSQL(
+            CHANGED_INDEX,
+            'DROP INDEX posts_post_changed_idx',
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+def search_index(table):
+    """Возвращает SQL создания и удаления индекса FTS5 над `text` таблицы.
+
+    Индекс хранит только токены: текст читается из самой таблицы
+    (external content), а триггеры поддерживают индекс в актуальном виде.
+    """
+    index = f'{table}_search'
+    delete = (
+        f"INSERT INTO {index} ({index}, rowid, text) "
+        f"VALUES ('delete', old.id, old.text);"
+    )
+    insert = f'INSERT INTO {index} (rowid, text) VALUES (new.id, new.text);'
+    forward = [
+        f'CREATE VIRTUAL TABLE {index} USING fts5(text, '
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f'CREATE TRIGGER {index}_insert AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {index}_delete AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {index}_update AFTER UPDATE OF text ON {table} '
+        f'BEGIN {delete} {insert} END',
+        f"INSERT INTO {index} ({index}) VALUES ('rebuild')",
+    ]
+    backward = [
+        f'DROP TRIGGER {index}_insert',
+        f'DROP TRIGGER {index}_delete',
+        f'DROP TRIGGER {index}_update',
+        f'DROP TABLE {index}',
+    ]
+    return forward, backward
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(*search_index('posts_post')),
+        migrations.RunSQL(*search_index('posts_comment')),
+    ]
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_timelines(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    follows = Follow.objects.filter(
+        author__stats__followers_count__lte=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(user_id=user_id, post_id=pk, created=created)
+                for pk, created in Post.objects.filter(author_id=author_id)
+                .order_by('-created')
+                .values_list('pk', 'created')[: settings.TIMELINE_BACKFILL]
+            ),
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Меняет только состояние моделей: схема таблицы не меняется.
+
+    AlterField в SQLite пересоздаёт таблицу `posts_post` и удаляет
+    триггеры полнотекстового индекса из миграции 0008.
+    """
+
+    dependencies = [
+        ('posts', '0009_backfill_timelines'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='post',
+                    name='thumbnail',
+                    field=models.ImageField(blank=True, default='', editable=False, upload_to='posts/cards/', verbose_name='миниатюра'),
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='variants',
+                    field=models.TextField(blank=True, default='', editable=False, help_text='Строки «путь ширина» с вариантами миниатюры в WebP.', verbose_name='варианты миниатюры'),
+                ),
+            ],
+        ),
+    ]
@@ -3,10 +3,14 @@ from django.contrib.auth import get_user_model
 from django.db import models
 
 from core.models import AuthoredModel, DefaultModel
+from core.storage import ContentAddressedStorage
 from core.utils import truncate
 
 User = get_user_model()
 
+# Каталог миниатюр карточек постов в хранилище.
+CARDS_DIR = 'posts/cards/'
+
 
 class Group(DefaultModel):
     """Модель ORM для хранения групп постов пользователей."""
@@ -14,6 +18,11 @@ class Group(DefaultModel):
     title = models.CharField('название', max_length=200)
     slug = models.SlugField('слаг', max_length=200, unique=True)
     description = models.TextField('описание')
+    posts_count = models.PositiveIntegerField(
+        'число постов',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'группа постов'
@@ -36,13 +45,68 @@ class Post(AuthoredModel):
     image = models.ImageField(
         'картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
+        blank=True,
+    )
+    thumbnail = models.ImageField(
+        'миниатюра',
+        upload_to=CARDS_DIR,
+        blank=True,
+        default='',
+        editable=False,
+    )
+    variants = models.TextField(
+        'варианты миниатюры',
         blank=True,
+        default='',
+        editable=False,
+        help_text='Строки «путь ширина» с вариантами миниатюры в WebP.',
+    )
+    comments_count = models.PositiveIntegerField(
+        'число комментариев',
+        default=0,
+        editable=False,
     )
 
     class Meta(AuthoredModel.Meta):
         default_related_name = 'posts'
         verbose_name = 'пост'
         verbose_name_plural = 'посты'
+        indexes = (
+            models.Index(
+                fields=('author', '-created', '-id'),
+                name='posts_post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('group', '-created', '-id'),
+                name='posts_post_group_feed_idx',
+            ),
+        )
+
+    @property
+    def variants_srcset(self) -> str:
+        """Значение атрибута `srcset` для вариантов миниатюры."""
+        storage = self.thumbnail.storage
+        return ', '.join(
+            f'{storage.url(name)} {width}w'
+            for name, width in (
+                line.rsplit(' ', 1) for line in self.variants.splitlines()
+            )
+        )
+
+
+class StoredImage(DefaultModel):
+    """Модель ORM для учёта ссылок постов на общие файлы картинок."""
+
+    name = models.CharField('путь', max_length=100, primary_key=True)
+    refs = models.IntegerField('число ссылок', default=0)
+
+    class Meta:
+        verbose_name = 'файл картинки'
+        verbose_name_plural = 'файлы картинок'
+
+    def __str__(self) -> str:
+        return self.name
 
 
 class Comment(AuthoredModel):
@@ -58,6 +122,12 @@ class Comment(AuthoredModel):
         default_related_name = 'comments'
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created'),
+                name='posts_comment_post_idx',
+            ),
+        )
 
 
 class Follow(DefaultModel):
@@ -79,6 +149,74 @@ class Follow(DefaultModel):
     class Meta:
         verbose_name = 'подписка'
         verbose_name_plural = 'подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='posts_follow_unique_author',
+            ),
+        )
 
     def __str__(self) -> str:
         return f'Пользователь `{self.user}` подписан на автора `{self.author}`'
+
+
+class TimelineEntry(DefaultModel):
+    """Модель ORM для материализованной ленты подписок пользователя."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='читатель',
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='пост',
+        related_name='timeline_entries',
+    )
+    created = models.DateTimeField('дата создания поста')
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'записи ленты'
+        indexes = (
+            models.Index(
+                fields=('user', '-created', '-post'),
+                name='posts_timeline_feed_idx',
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='posts_timeline_unique_post',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'Пост `{self.post_id}` в ленте `{self.user}`'
+
+
+class AuthorStats(DefaultModel):
+    """Модель ORM для счётчиков постов и подписок пользователя."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='пользователь',
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField('число постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'число подписчиков',
+        default=0,
+    )
+    following_count = models.PositiveIntegerField('число подписок', default=0)
+
+    class Meta:
+        verbose_name = 'счётчики пользователя'
+        verbose_name_plural = 'счётчики пользователей'
+
+    def __str__(self) -> str:
+        return f'Счётчики пользователя `{self.user_id}`'
@@ -0,0 +1,104 @@
+import re
+from typing import Iterable, List
+
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+from posts.models import Post
+
+# Таблицы FTS5 из миграции 0008_search.
+POST_INDEX = 'posts_post_search'
+COMMENT_INDEX = 'posts_comment_search'
+
+# Границы найденных слов во фрагменте; экранирование их не затрагивает.
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+SNIPPET_TOKENS = 24
+
+TERM = re.compile(r'\w+')
+
+
+def match_expression(query: str) -> str:
+    """Строит запрос FTS5, в котором каждое слово ищется как префикс.
+
+    Операторы и кавычки из пользовательского ввода отбрасываются,
+    поэтому любая строка даёт синтаксически верный запрос.
+    """
+    return ' '.join(f'"{term}"*' for term in TERM.findall(query))
+
+
+def matching(queryset: QuerySet, index: str, query: str) -> QuerySet:
+    """Оставляет в запросе объекты, текст которых подходит под `query`.
+
+    Args:
+        queryset: Запрос к модели, проиндексированной в `index`.
+        index: Имя таблицы FTS5.
+        query: Строка поиска от пользователя.
+
+    Returns:
+        Отфильтрованный запрос или пустой, если в строке нет слов.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    # `pk__in=RawSQL(...)` оборачивает подзапрос в двойные скобки,
+    # и SQLite берёт из него лишь первую строку.
+    return queryset.extra(
+        where=[
+            f'{queryset.model._meta.db_table}.id IN '
+            f'(SELECT rowid FROM {index} WHERE {index} MATCH %s)',
+        ],
+        params=[expression],
+    )
+
+
+def search_posts(query: str) -> QuerySet:
+    """Ищет посты по тексту с сортировкой по релевантности (BM25).
+
+    Релевантность считается в сортировке, а не в аннотации, чтобы
+    подсчёт результатов для пагинатора оставался простым COUNT.
+    """
+    posts = Post.objects.select_related('author', 'group')
+    return matching(posts, POST_INDEX, query).order_by(
+        RawSQL(
+            f'SELECT rank FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s '
+            f'AND rowid = {Post._meta.db_table}.id',
+            (match_expression(query),),
+        ),
+        '-pk',
+    )
+
+
+def add_snippets(posts: Iterable[Post], query: str) -> List[Post]:
+    """Добавляет постам фрагменты текста с найденными словами.
+
+    Фрагменты выбираются одним запросом только для переданных постов;
+    найденные слова в атрибуте `snippet` обрамлены `MARK_START`
+    и `MARK_END`.
+    """
+    posts = list(posts)
+    snippets = dict(
+        matching(
+            Post.objects.filter(pk__in=[post.pk for post in posts]),
+            POST_INDEX,
+            query,
+        )
+        .annotate(
+            snippet=RawSQL(
+                f"SELECT snippet({POST_INDEX}, 0, %s, %s, '…', %s) "
+                f'FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s '
+                f'AND rowid = {Post._meta.db_table}.id',
+                (
+                    MARK_START,
+                    MARK_END,
+                    SNIPPET_TOKENS,
+                    match_expression(query),
+                ),
+            ),
+        )
+        .values_list('pk', 'snippet'),
+    )
+    for post in posts:
+        post.snippet = snippets.get(post.pk, '')
+    return posts
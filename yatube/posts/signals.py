@@ -0,0 +1,213 @@
+from django.conf import settings
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_version
+from core.paginator import invalidate_counts, invalidate_feeds
+from core.tasks import run_in_background
+from posts import counters, media, timeline
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_counts(sender, **kwargs) -> None:
+    """Сбрасывает кэш числа постов в лентах."""
+    del kwargs
+    invalidate_counts(sender)
+
+
+# Поля пользователя, которые выводятся в лентах и карточках постов.
+RENDERED_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def renders_user(**kwargs) -> bool:
+    """Проверяет, могло ли сохранение пользователя изменить страницы.
+
+    Сохранения только служебных полей, например `last_login` при
+    каждом входе, кэш лент и карточек не сбрасывают.
+    """
+    update_fields = kwargs.get('update_fields')
+    return update_fields is None or bool(
+        RENDERED_USER_FIELDS.intersection(update_fields),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_feed_pages(sender, **kwargs) -> None:
+    """Сбрасывает кэш страниц лент при изменении их данных."""
+    if sender is User and not renders_user(**kwargs):
+        return
+    invalidate_feeds()
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance: User, created: bool, **kwargs):
+    """Создаёт счётчики нового пользователя."""
+    del sender, kwargs
+    if created:
+        AuthorStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def count_posts(sender, instance: Post, **kwargs) -> None:
+    """Обновляет счётчики постов автора и группы."""
+    del sender
+    if kwargs.get('created') is False:
+        move_group_counter(instance, kwargs.get('update_fields'))
+        return
+    delta = 1 if kwargs.get('created') else -1
+    instance.stored_group_id = instance.group_id
+    counters.add_author_stat(instance.author_id, 'posts_count', delta)
+    if instance.group_id:
+        counters.add(
+            Group.objects.filter(pk=instance.group_id),
+            'posts_count',
+            delta,
+        )
+
+
+def move_group_counter(instance: Post, update_fields) -> None:
+    """Переносит сохранённый пост между счётчиками групп."""
+    if update_fields is not None and 'group' not in update_fields:
+        return
+    if instance.stored_group_id is DEFERRED:
+        return
+    if instance.group_id != instance.stored_group_id:
+        counters.move_post(instance.stored_group_id, instance.group_id)
+        instance.stored_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def count_comments(sender, instance: Comment, **kwargs) -> None:
+    """Обновляет счётчик комментариев поста."""
+    del sender
+    if kwargs.get('created') is False:
+        return
+    counters.add(
+        Post.objects.filter(pk=instance.post_id),
+        'comments_count',
+        1 if kwargs.get('created') else -1,
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def count_follows(sender, instance: Follow, **kwargs) -> None:
+    """Обновляет счётчики подписчиков автора и подписок пользователя."""
+    del sender
+    if kwargs.get('created') is False:
+        return
+    delta = 1 if kwargs.get('created') else -1
+    counters.add_author_stat(instance.author_id, 'followers_count', delta)
+    counters.add_author_stat(instance.user_id, 'following_count', delta)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance: Post, created: bool, **kwargs) -> None:
+    """Раскладывает новый пост по лентам подписчиков."""
+    del sender, kwargs
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(
+    sender,
+    instance: Follow,
+    created: bool,
+    **kwargs,
+) -> None:
+    """Заполняет ленту подписчика постами нового автора."""
+    del sender, kwargs
+    if created:
+        timeline.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance: Follow, **kwargs) -> None:
+    """Очищает ленту подписчика от постов автора после отписки.
+
+    Если число подписчиков автора опустилось до порога раскладки,
+    его посты раскладываются по лентам оставшихся подписчиков.
+    """
+    del sender, kwargs
+    timeline.trim(instance)
+    if AuthorStats.objects.filter(
+        user_id=instance.author_id,
+        followers_count=settings.TIMELINE_FANOUT_LIMIT,
+    ).exists():
+        run_in_background(timeline.refill, instance.author_id)
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance: Post, **kwargs) -> None:
+    """Запоминает загруженный из базы путь картинки поста."""
+    del sender, kwargs
+    instance.stored_image = str(instance.__dict__.get('image') or '')
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance: Post, **kwargs) -> None:
+    """Запоминает загруженную из базы группу поста."""
+    del sender, kwargs
+    instance.stored_group_id = instance.__dict__.get('group_id', DEFERRED)
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs(sender, instance: Post, **kwargs) -> None:
+    """Переносит ссылку поста на новый файл картинки."""
+    del sender
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    if instance.image.name != instance.stored_image:
+        media.acquire(instance.image.name)
+        media.release(instance.stored_image)
+        instance.stored_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_files(sender, instance: Post, **kwargs) -> None:
+    """Удаляет картинку и миниатюры поста после фиксации удаления."""
+    del sender, kwargs
+    media.release(instance.image.name)
+    media.delete_later(media.post_files(instance))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_comments(sender, instance: Comment, **kwargs) -> None:
+    """Сдвигает поколения комментариев поста и всех постов."""
+    del sender, kwargs
+    bump_version(f'comments:{instance.post_id}')
+    bump_version('comments')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follows(sender, instance: Follow, **kwargs) -> None:
+    """Сдвигает поколение подписок подписчика и автора."""
+    del sender, kwargs
+    bump_version(f'follows:{instance.user.username}')
+    bump_version(f'follows:{instance.author.username}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_cards(sender, instance, **kwargs) -> None:
+    """Сдвигает поколение карточек постов автора или группы."""
+    if sender is User and not renders_user(**kwargs):
+        return
+    prefix = 'user' if sender is User else 'group'
+    bump_version(f'{prefix}:{instance.pk}')
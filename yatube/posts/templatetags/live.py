@@ -0,0 +1,30 @@
+from django import template
+from django.conf import settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/new_posts.html', takes_context=True)
+def new_posts_banner(context: dict, **params) -> dict:
+    """Выводит скрытую плашку «Новые записи» над первой страницей ленты.
+
+    Плашка опрашивает `new_posts` раз в `LIVE_POLL_INTERVAL` секунд,
+    а при `LIVE_STREAM_ENABLED` подписывается на поток SSE.
+    """
+    page = context['page_obj']
+    if getattr(page, 'previous_cursor', '') or page.has_previous():
+        return {}
+    latest = page.object_list[0].pk if page.object_list else 0
+    query = urlencode({**params, 'since': latest})
+    return {
+        'path': context['request'].path,
+        'count_url': f'{reverse("posts:new_posts")}?{query}',
+        'stream_url': (
+            f'{reverse("posts:new_posts_stream")}?{query}'
+            if settings.LIVE_STREAM_ENABLED
+            else ''
+        ),
+        'interval': settings.LIVE_POLL_INTERVAL,
+    }
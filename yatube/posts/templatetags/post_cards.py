@@ -0,0 +1,63 @@
+from typing import Dict, Iterable, List
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeText, mark_safe
+
+from core.cache import get_versions
+from posts import thumbnails
+from posts.models import Post
+
+register = template.Library()
+
+
+def card_key(post: Post, grouplink: bool, versions: Dict[str, int]) -> str:
+    return 'card:{}:{}:{}:{}:{}:{}'.format(
+        post.pk,
+        (post.modified or post.created).timestamp(),
+        post.thumbnail.name,
+        int(grouplink),
+        versions[f'user:{post.author_id}'],
+        versions.get(f'group:{post.group_id}', ''),
+    )
+
+
+@register.simple_tag
+def render_cards(
+    posts: Iterable[Post],
+    grouplink: bool = False,
+) -> List[SafeText]:
+    """Возвращает HTML карточек постов, закэшированных по отдельности.
+
+    Все карточки страницы читаются из кэша одним `get_many`, шаблон
+    рендерится только для промахов. Миниатюры картинок разрешаются
+    заранее для всей страницы.
+
+    Args:
+        posts: Посты страницы ленты.
+        grouplink: Выводить ли в карточке ссылку на группу.
+
+    Returns:
+        Список HTML-кодов карточек в порядке постов.
+    """
+    posts = list(posts)
+    thumbnails.prefetch(posts)
+    versions = get_versions(
+        {f'user:{post.author_id}' for post in posts}
+        | {f'group:{post.group_id}' for post in posts if post.group_id},
+    )
+    keys = [card_key(post, grouplink, versions) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {
+        key: render_to_string(
+            'posts/includes/post.html',
+            {'post': post, 'grouplink': grouplink},
+        )
+        for key, post in zip(keys, posts)
+        if key not in cards
+    }
+    cache.set_many(missing, settings.CARD_CACHE_TIMEOUT)
+    cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
@@ -4,9 +4,12 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 
 
-def get_image(name: str = 'giffy.gif') -> SimpleUploadedFile:
+def get_image(
+    name: str = 'giffy.gif',
+    color: tuple = (155, 0, 0),
+) -> SimpleUploadedFile:
     file = BytesIO()
-    Image.new('RGBA', size=(1, 1), color=(155, 0, 0)).save(file, 'gif')
+    Image.new('RGBA', size=(1, 1), color=color).save(file, 'gif')
     file.name = name
     file.seek(0)
     return SimpleUploadedFile(
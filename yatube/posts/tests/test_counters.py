@@ -0,0 +1,154 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+class CountersTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.user, cls.auth = mixer.blend(User), Client()
+        cls.auth.force_login(cls.user)
+        cls.author = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+
+    def assertCounters(self, expected: dict) -> None:
+        for obj, fields in expected.items():
+            obj.refresh_from_db()
+            for field, value in fields.items():
+                with self.subTest(obj=obj, field=field):
+                    self.assertEqual(
+                        getattr(obj, field),
+                        value,
+                        f'Неверное значение счётчика {field}',
+                    )
+
+    def test_post_counters(self) -> None:
+        """Проверяем счётчики постов автора и группы."""
+        post = mixer.blend(
+            Post,
+            author=self.author,
+            group=self.group,
+            image=None,
+        )
+        self.assertCounters(
+            {
+                self.author.stats: {'posts_count': 1},
+                self.group: {'posts_count': 1},
+            },
+        )
+        post.delete()
+        self.assertCounters(
+            {
+                self.author.stats: {'posts_count': 0},
+                self.group: {'posts_count': 0},
+            },
+        )
+
+    def test_edit_moves_group_counter(self) -> None:
+        """Проверяем перенос счётчика при смене группы поста."""
+        post = mixer.blend(Post, author=self.user, image=None)
+        self.auth.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            data={'text': post.text, 'group': self.group.pk},
+        )
+        self.assertCounters({self.group: {'posts_count': 1}})
+
+    def test_save_moves_group_counter(self) -> None:
+        """Проверяем перенос счётчика при смене группы вне формы поста."""
+        other = mixer.blend(Group)
+        post = mixer.blend(Post, author=self.user, image=None)
+        post.group = self.group
+        post.save()
+        self.assertCounters({self.group: {'posts_count': 1}})
+        post = Post.objects.get(pk=post.pk)
+        post.group = other
+        post.save(update_fields=('group',))
+        self.assertCounters(
+            {
+                self.group: {'posts_count': 0},
+                other: {'posts_count': 1},
+            },
+        )
+
+    def test_drifted_counter_stays_positive(self) -> None:
+        """Проверяем удаление поста при разошедшемся счётчике группы."""
+        post = mixer.blend(
+            Post,
+            author=self.author,
+            group=self.group,
+            image=None,
+        )
+        Group.objects.update(posts_count=0)
+        post.delete()
+        self.assertCounters({self.group: {'posts_count': 0}})
+
+    def test_comment_counter(self) -> None:
+        """Проверяем счётчик комментариев поста."""
+        post = mixer.blend(Post, author=self.author, image=None)
+        self.auth.post(
+            reverse('posts:add_comment', args=(post.pk,)),
+            data={'text': 'Комментарий'},
+        )
+        self.assertCounters({post: {'comments_count': 1}})
+        Comment.objects.get().delete()
+        self.assertCounters({post: {'comments_count': 0}})
+
+    def test_follow_counters(self) -> None:
+        """Проверяем счётчики подписчиков и подписок."""
+        self.auth.get(
+            reverse('posts:profile_follow', args=(self.author.username,)),
+        )
+        self.assertCounters(
+            {
+                self.author.stats: {'followers_count': 1},
+                self.user.stats: {'following_count': 1},
+            },
+        )
+        self.auth.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,)),
+        )
+        self.assertCounters(
+            {
+                self.author.stats: {'followers_count': 0},
+                self.user.stats: {'following_count': 0},
+            },
+        )
+
+    def test_recount_command(self) -> None:
+        """Проверяем, что команда исправляет расхождения счётчиков."""
+        post = mixer.blend(Post, author=self.author, image=None)
+        Follow.objects.create(user=self.user, author=self.author)
+        AuthorStats.objects.all().delete()
+        Post.objects.update(comments_count=10)
+        call_command('recount_counters', stdout=StringIO())
+        self.assertCounters(
+            {
+                AuthorStats.objects.get(user=self.author): {
+                    'posts_count': 1,
+                    'followers_count': 1,
+                },
+                AuthorStats.objects.get(user=self.user): {
+                    'following_count': 1,
+                },
+                post: {'comments_count': 0},
+            },
+        )
+
+    @mock.patch('posts.counters.BATCH_SIZE', 1)
+    def test_recount_in_batches(self) -> None:
+        """Проверяем пересчёт, когда строки создаются мелкими пачками."""
+        AuthorStats.objects.all().delete()
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(
+            AuthorStats.objects.count(),
+            User.objects.count(),
+            'Счётчики созданы не для всех пользователей',
+        )
@@ -0,0 +1,110 @@
+import json
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import BytesIO
+from zipfile import ZipFile
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import Comment, Follow, Post, User
+from posts.tests.common import get_image
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ExportTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.user, cls.auth = mixer.blend(User), Client()
+        cls.auth.force_login(cls.user)
+        cls.author = mixer.blend(User)
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def download(self) -> ZipFile:
+        response = self.auth.get(reverse('posts:profile_export'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        chunks = list(response.streaming_content)
+        self.assertTrue(all(chunks), 'Ответ содержит пустые части')
+        return ZipFile(BytesIO(b''.join(chunks)))
+
+    def test_archive(self) -> None:
+        """Проверяем JSON и картинки в архиве данных пользователя."""
+        image = get_image()
+        posts = [
+            mixer.blend(
+                Post,
+                author=self.user,
+                image=get_image(),
+                thumbnail='',
+                variants='',
+            )
+            for _ in range(2)
+        ]
+        mixer.blend(Post, author=self.author, image=None)
+        comment = mixer.blend(Comment, author=self.user, post=posts[0])
+        with self.download() as archive:
+            self.assertIsNone(archive.testzip())
+            data = {
+                name: json.loads(archive.read(name))
+                for name in archive.namelist()
+                if name.endswith('.json')
+            }
+            self.assertEqual(
+                archive.read(f'media/{posts[0].image.name}'),
+                image.read(),
+            )
+        self.assertEqual(
+            data['profile.json'][0]['username'],
+            self.user.username,
+        )
+        self.assertEqual(
+            [post['id'] for post in data['posts.json']],
+            [post.pk for post in posts],
+        )
+        self.assertEqual(
+            data['comments.json'],
+            [
+                {
+                    'id': comment.pk,
+                    'post_id': posts[0].pk,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                    'modified': None,
+                },
+            ],
+        )
+        self.assertEqual(
+            data['follows.json'],
+            [{'author__username': self.author.username}],
+        )
+
+    def test_empty_archive(self) -> None:
+        """Проверяем архив пользователя без постов и комментариев."""
+        with self.download() as archive:
+            self.assertEqual(json.loads(archive.read('posts.json')), [])
+            self.assertFalse(
+                [
+                    name
+                    for name in archive.namelist()
+                    if name.startswith('media/')
+                ],
+            )
+
+    def test_login_required(self) -> None:
+        """Проверяем, что гость перенаправляется на страницу входа."""
+        response = self.client.get(reverse('posts:profile_export'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
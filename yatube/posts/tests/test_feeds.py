@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import Group, Post, User
+
+
+class SyndicationFeedTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.author = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        cls.post = mixer.blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+            image=None,
+        )
+        cls.other = mixer.blend(Post, image=None)
+        cls.urls = {
+            reverse('posts:index_rss'): 'application/rss+xml',
+            reverse('posts:index_atom'): 'application/atom+xml',
+            reverse(
+                'posts:group_rss',
+                args=(cls.group.slug,),
+            ): 'application/rss+xml',
+            reverse(
+                'posts:group_atom',
+                args=(cls.group.slug,),
+            ): 'application/atom+xml',
+            reverse(
+                'posts:profile_rss',
+                args=(cls.author.username,),
+            ): 'application/rss+xml',
+            reverse(
+                'posts:profile_atom',
+                args=(cls.author.username,),
+            ): 'application/atom+xml',
+        }
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_feeds(self) -> None:
+        """Проверяем содержимое и тип лент RSS и Atom."""
+        link = reverse('posts:post_detail', args=(self.post.pk,))
+        for url, content_type in self.urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(
+                    response['Content-Type'].startswith(content_type),
+                )
+                self.assertContains(response, link)
+        response = self.client.get(
+            reverse('posts:group_rss', args=(self.group.slug,)),
+        )
+        self.assertNotContains(
+            response,
+            reverse('posts:post_detail', args=(self.other.pk,)),
+        )
+
+    def test_conditional_get(self) -> None:
+        """Проверяем ответ 304 на опрос ленты без изменений."""
+        url = reverse('posts:group_atom', args=(self.group.slug,))
+        response = self.client.get(url)
+        for headers in (
+            {'HTTP_IF_NONE_MATCH': response['ETag']},
+            {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+        ):
+            with self.subTest(headers=headers):
+                self.assertEqual(
+                    self.client.get(url, **headers).status_code,
+                    HTTPStatus.NOT_MODIFIED,
+                )
+
+    def test_rendered_once_per_change(self) -> None:
+        """Проверяем, что лента собирается заново только после изменений."""
+        url = reverse('posts:index_rss')
+        first = self.client.get(url)
+        cached = self.client.get(url)
+        self.assertEqual(cached.content, first.content)
+        self.assertLess(
+            int(cached['X-Query-Count']),
+            int(first['X-Query-Count']),
+        )
+        post = mixer.blend(Post, image=None)
+        self.assertContains(
+            self.client.get(url),
+            reverse('posts:post_detail', args=(post.pk,)),
+        )
+
+    def test_cached_per_host(self) -> None:
+        """Проверяем, что лента из кэша не ссылается на чужой хост."""
+        url = reverse('posts:index_rss')
+        first = self.client.get(url, HTTP_HOST='localhost')
+        second = self.client.get(url, HTTP_HOST='127.0.0.1')
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertContains(first, 'http://localhost/')
+        self.assertContains(second, 'http://127.0.0.1/')
+        self.assertNotContains(second, 'http://localhost/')
+
+    def test_unknown_group(self) -> None:
+        """Проверяем 404 для ленты несуществующей группы."""
+        response = self.client.get(
+            reverse('posts:group_rss', args=('missing',)),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
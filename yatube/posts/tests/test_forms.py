@@ -1,14 +1,22 @@
 import shutil
 import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from faker import Faker
 from mixer.backend.django import mixer
+from PIL import Image
 from testdata import wrap_testdata
 
-from posts.models import Comment, Group, Post, User
+from posts import media
+from posts.images import ORIENTATION
+from posts.models import Comment, Group, Post, StoredImage, User
 from posts.tests.common import get_image
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -48,8 +56,7 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(
             Post.objects.all().count(),
             1,
-            'Неверное количество постов'
-            'после отправки валидной формы',
+            'Неверное количество постов' 'после отправки валидной формы',
         )
         post = Post.objects.get()
         fields = (
@@ -77,6 +84,76 @@ class PostCreateFormTests(TestCase):
                     message,
                 )
 
+    def test_create_post_thumbnail(self) -> None:
+        """Миниатюра картинки строится при сохранении формы."""
+        self.auth.post(
+            reverse('posts:post_create'),
+            data={'text': Faker().text(), 'image': get_image()},
+        )
+        post = Post.objects.get()
+        self.assertTrue(post.thumbnail, 'Миниатюра не построена')
+        self.assertEqual(
+            (post.thumbnail.width, post.thumbnail.height),
+            (960, 339),
+            'Неверный размер миниатюры',
+        )
+        with mock.patch('sorl.thumbnail.get_thumbnail') as get_thumbnail:
+            response = self.auth.get(reverse('posts:index'))
+        get_thumbnail.assert_not_called()
+        self.assertContains(response, post.thumbnail.url)
+
+    @override_settings(POST_IMAGE_MAX_SIDE=100)
+    def test_create_post_image_processing(self) -> None:
+        """Картинка поворачивается по EXIF, очищается и уменьшается."""
+        exif = Image.Exif()
+        exif[ORIENTATION] = 6
+        file = BytesIO()
+        Image.new('RGB', (300, 100)).save(file, 'jpeg', exif=exif)
+        self.auth.post(
+            reverse('posts:post_create'),
+            data={
+                'text': Faker().text(),
+                'image': SimpleUploadedFile('photo.jpg', file.getvalue()),
+            },
+        )
+        post = Post.objects.get()
+        self.assertRegex(
+            post.image.name,
+            r'^posts/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.jpg$',
+            'Обработанная картинка сохранена не по хэшу в каталоге posts',
+        )
+        with Image.open(post.image) as image:
+            self.assertEqual(image.size, (33, 100), 'Неверный размер')
+            self.assertNotIn('exif', image.info, 'Метаданные не удалены')
+        self.assertEqual(
+            len(post.variants.splitlines()),
+            len(settings.POST_IMAGE_WIDTHS),
+            'Неверное число вариантов миниатюры',
+        )
+        self.assertContains(
+            self.auth.get(reverse('posts:index')),
+            post.variants_srcset,
+        )
+
+    def test_create_post_converted_image(self) -> None:
+        """Картинка в другом формате сохраняется как JPEG с его расширением."""
+        file = BytesIO()
+        Image.new('RGB', (10, 10)).save(file, 'bmp')
+        self.auth.post(
+            reverse('posts:post_create'),
+            data={
+                'text': Faker().text(),
+                'image': SimpleUploadedFile('photo.bmp', file.getvalue()),
+            },
+        )
+        post = Post.objects.get()
+        self.assertTrue(
+            post.image.name.endswith('.jpg'),
+            'Расширение файла не совпадает с форматом',
+        )
+        with Image.open(post.image) as image:
+            self.assertEqual(image.format, 'JPEG', 'Неверный формат')
+
     def test_edit_post(self) -> None:
         """Валидная форма сохраняет изменения в посте."""
         post = mixer.blend(Post, group=self.group, author=self.user)
@@ -116,6 +193,115 @@ class PostCreateFormTests(TestCase):
                     message,
                 )
 
+    def test_edit_post_removes_old_files(self) -> None:
+        """Файлы заменённой картинки удаляются вместе с миниатюрами."""
+        self.auth.post(
+            reverse('posts:post_create'),
+            data={'text': Faker().text(), 'image': get_image()},
+        )
+        post = Post.objects.get()
+        old_files = [post.image.name, *media.post_files(post)]
+        self.auth.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            data={
+                'text': post.text,
+                'image': get_image('image_3.gif', color=(0, 155, 0)),
+            },
+        )
+        post.refresh_from_db()
+        for name in old_files:
+            with self.subTest(name=name):
+                self.assertFalse(
+                    default_storage.exists(name),
+                    'Файл заменённой картинки не удалён',
+                )
+        for name in [post.image.name, *media.post_files(post)]:
+            with self.subTest(name=name):
+                self.assertTrue(
+                    default_storage.exists(name),
+                    'Файл новой картинки удалён',
+                )
+
+    def test_collect_media(self) -> None:
+        """Сборщик удаляет только файлы, на которые не ссылаются посты."""
+        self.auth.post(
+            reverse('posts:post_create'),
+            data={'text': Faker().text(), 'image': get_image()},
+        )
+        post = Post.objects.get()
+        orphan = default_storage.save('posts/orphan.gif', get_image())
+        call_command('collect_media', '--min-age=-1', stdout=StringIO())
+        self.assertFalse(
+            default_storage.exists(orphan),
+            'Забытый файл не удалён',
+        )
+        for name in [post.image.name, *media.post_files(post)]:
+            with self.subTest(name=name):
+                self.assertTrue(
+                    default_storage.exists(name),
+                    'Удалён файл, на который ссылается пост',
+                )
+
+    def test_same_image_shared(self) -> None:
+        """Одинаковые картинки хранятся одним файлом до последней ссылки."""
+        for _ in range(2):
+            self.auth.post(
+                reverse('posts:post_create'),
+                data={'text': Faker().text(), 'image': get_image()},
+            )
+        first, second = Post.objects.all()
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, media.HASHED_NAME)
+        self.assertEqual(StoredImage.objects.get().refs, 2)
+        self.auth.post(reverse('posts:post_delete', args=(first.pk,)))
+        self.assertTrue(
+            default_storage.exists(second.image.name),
+            'Удалён файл, на который ссылается другой пост',
+        )
+        self.auth.post(reverse('posts:post_delete', args=(second.pk,)))
+        self.assertFalse(
+            default_storage.exists(second.image.name),
+            'Файл без ссылок не удалён',
+        )
+        self.assertFalse(StoredImage.objects.exists())
+
+    def test_reacquired_image_kept(self) -> None:
+        """Картинка, на которую снова сослались, не удаляется."""
+        post = mixer.blend(Post, author=self.user, image=get_image())
+        media.acquire(post.image.name)
+        media.remove_unused(post.image.name)
+        self.assertTrue(default_storage.exists(post.image.name))
+        self.assertTrue(StoredImage.objects.exists())
+
+    def test_migrate_media(self) -> None:
+        """Команда переносит старые картинки в хранилище по хэшу."""
+        name = default_storage.save('posts/legacy.gif', get_image())
+        post, other = mixer.cycle(2).blend(
+            Post,
+            author=self.user,
+            image=name,
+        )
+        call_command('migrate_media', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        other.refresh_from_db()
+        self.assertRegex(post.image.name, media.HASHED_NAME)
+        self.assertEqual(other.image.name, post.image.name)
+        self.assertTrue(default_storage.exists(post.image.name))
+        self.assertFalse(default_storage.exists(name))
+        self.assertEqual(StoredImage.objects.get().refs, 2)
+
+    @mock.patch('posts.media.BATCH_SIZE', 1)
+    def test_recount_refs_in_batches(self) -> None:
+        """Ссылки на картинки пересчитываются мелкими пачками."""
+        for color in ((1, 0, 0), (2, 0, 0), (2, 0, 0)):
+            mixer.blend(Post, author=self.user, image=get_image(color=color))
+        StoredImage.objects.all().delete()
+        media.recount_refs()
+        self.assertEqual(
+            sorted(StoredImage.objects.values_list('refs', flat=True)),
+            [1, 2],
+        )
+
     def test_guest_cant_create_post(self) -> None:
         """Аноним не создаёт пост."""
         self.client.post(
@@ -126,8 +312,7 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(
             Post.objects.count(),
             0,
-            'Неверное количество постов'
-            'после создания поста анонимом',
+            'Неверное количество постов' 'после создания поста анонимом',
         )
 
     def test_guest_cant_edit_post(self) -> None:
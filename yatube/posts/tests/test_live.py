@@ -0,0 +1,121 @@
+import json
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import Follow, Group, Post, User
+
+
+class NewPostsTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.user, cls.auth = mixer.blend(User), Client()
+        cls.auth.force_login(cls.user)
+        cls.author = mixer.blend(User)
+        cls.group = mixer.blend(Group)
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.first = mixer.blend(Post, image=None)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def count(self, client: Client = None, **params) -> dict:
+        response = (client or self.auth).get(
+            reverse('posts:new_posts'),
+            {'since': self.first.pk, **params},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()
+
+    def test_counts_by_feed(self) -> None:
+        """Проверяем число новых постов в каждой ленте."""
+        mixer.blend(Post, author=self.author, group=self.group, image=None)
+        latest = mixer.blend(Post, image=None)
+        for params, count in (
+            ({'feed': 'index'}, 2),
+            ({'feed': 'group', 'slug': self.group.slug}, 1),
+            ({'feed': 'follow'}, 1),
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.count(**params),
+                    {'count': count, 'latest': latest.pk},
+                )
+
+    def test_nothing_new_skips_database(self) -> None:
+        """Проверяем, что без новых постов ответ берётся из кэша."""
+        self.count()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.count(Client()),
+                {'count': 0, 'latest': self.first.pk},
+            )
+
+    @override_settings(NEW_POSTS_LIMIT=2)
+    def test_count_is_bounded(self) -> None:
+        """Проверяем, что счёт останавливается на NEW_POSTS_LIMIT."""
+        mixer.cycle(3).blend(Post, image=None)
+        self.assertEqual(self.count()['count'], 2)
+
+    def test_bad_requests(self) -> None:
+        """Проверяем ответы на неверные параметры и чужую ленту."""
+        url = reverse('posts:new_posts')
+        for client, params, status in (
+            (self.auth, {'feed': 'unknown', 'since': 1}, HTTPStatus.NOT_FOUND),
+            (self.auth, {'since': 'x'}, HTTPStatus.NOT_FOUND),
+            (Client(), {'feed': 'follow', 'since': 1}, HTTPStatus.FORBIDDEN),
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    client.get(url, params).status_code,
+                    status,
+                )
+
+    def test_stream_disabled(self) -> None:
+        """Проверяем, что без настройки поток SSE не подключается."""
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:new_posts_stream'),
+                {'since': self.first.pk},
+            ).status_code,
+            HTTPStatus.NOT_FOUND,
+        )
+        self.assertNotContains(
+            self.client.get(reverse('posts:index')),
+            'data-stream',
+        )
+
+    @override_settings(LIVE_STREAM_ENABLED=True, LIVE_STREAM_SECONDS=0)
+    def test_stream(self) -> None:
+        """Проверяем событие SSE с числом новых постов."""
+        post = mixer.blend(Post, image=None)
+        response = self.client.get(
+            reverse('posts:new_posts_stream'),
+            {'since': self.first.pk},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = b''.join(response.streaming_content).decode().split('\n\n')
+        self.assertTrue(events[0].startswith('retry: '))
+        self.assertContains(
+            self.client.get(reverse('posts:index')),
+            'data-stream',
+        )
+        self.assertEqual(
+            json.loads(events[1].replace('data: ', '', 1)),
+            {'count': 1, 'latest': post.pk},
+        )
+
+    def test_banner(self) -> None:
+        """Проверяем плашку новых постов в лентах."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'id="new-posts"')
+        self.assertContains(response, f'since={self.first.pk}')
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,)),
+        )
+        self.assertContains(response, f'slug={self.group.slug}')
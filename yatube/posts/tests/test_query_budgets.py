@@ -0,0 +1,99 @@
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import resolve, reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.user, cls.author = mixer.cycle(2).blend(User)
+        cls.group = mixer.blend(Group)
+        cls.posts = mixer.cycle(15).blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+            image=None,
+            thumbnail='',
+            variants='',
+        )
+        mixer.cycle(5).blend(Comment, post=cls.posts[0], author=cls.user)
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.auth = Client()
+        self.auth.force_login(self.user)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def assertWithinBudget(
+        self,
+        client: Client,
+        method: str,
+        url: str,
+    ) -> None:
+        """Проверяем, что у view задан бюджет и запрос в него укладывается.
+
+        Повторы запросов одной формы (N+1) `QueryBudgetMiddleware`
+        в тестах превращает в ошибку.
+        """
+        data = {'text': 'Текст'} if method == 'post' else None
+        response = getattr(client, method)(url, data)
+        view = resolve(urlsplit(url).path).func
+        budget = getattr(view, 'query_budget', None)
+        with self.subTest(method=method, url=url):
+            self.assertIsNotNone(budget, 'У view не задан бюджет запросов')
+            self.assertLessEqual(int(response['X-Query-Count']), budget)
+
+    def test_read_views(self) -> None:
+        """Проверяем бюджеты страниц с лентами и постами."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:post_detail', args=(self.posts[0].pk,)),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=текст',
+        ):
+            self.assertWithinBudget(self.auth, 'get', url)
+
+    def test_write_views(self) -> None:
+        """Проверяем бюджеты страниц, изменяющих данные."""
+        post = self.posts[1]
+        for client, method, url in (
+            (self.auth, 'get', reverse('posts:post_create')),
+            (self.auth, 'post', reverse('posts:post_create')),
+            (
+                self.author_client,
+                'post',
+                reverse('posts:post_edit', args=(post.pk,)),
+            ),
+            (self.auth, 'post', reverse('posts:add_comment', args=(post.pk,))),
+            (
+                self.auth,
+                'get',
+                reverse(
+                    'posts:profile_unfollow',
+                    args=(self.author.username,),
+                ),
+            ),
+            (
+                self.auth,
+                'get',
+                reverse('posts:profile_follow', args=(self.author.username,)),
+            ),
+            (
+                self.author_client,
+                'get',
+                reverse('posts:post_delete', args=(post.pk,)),
+            ),
+        ):
+            self.assertWithinBudget(client, method, url)
@@ -0,0 +1,122 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import Comment, Follow, Group, Post, User
+
+# Шаг плана, читающий таблицу целиком без индекса.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\S+( AS \S+)?$')
+
+
+class QueryPlanTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.user, cls.author = mixer.cycle(2).blend(User)
+        cls.auth = Client()
+        cls.auth.force_login(cls.user)
+        cls.group = mixer.blend(Group)
+        cls.posts = mixer.cycle(15).blend(
+            Post,
+            author=cls.author,
+            group=cls.group,
+            image=None,
+        )
+        mixer.cycle(3).blend(Comment, post=cls.posts[0], author=cls.user)
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def assertIndexedPlans(
+        self,
+        client: Client,
+        url: str,
+        merged: bool = False,
+    ) -> None:
+        """Проверяем, что запросы страницы не сканируют таблицы целиком
+        и не сортируют строки во временных B-деревьях.
+
+        При `merged` допускается сортировка постов подмешиваемых авторов:
+        они читаются одним запросом в пределах окна страницы.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        for query in queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            with self.subTest(url=url, sql=sql):
+                self.assertEqual(
+                    [
+                        step
+                        for step in plan
+                        if FULL_SCAN.match(step)
+                        or 'TEMP B-TREE' in step
+                        and not (merged and 'author_id" IN (' in sql)
+                    ],
+                    [],
+                    f'Неэффективный план запроса: {plan}',
+                )
+
+    def test_feed_plans(self) -> None:
+        """Проверяем планы запросов лент."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:group_list', args=(self.group.slug,)) + '?page=2',
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:profile', args=(self.author.username,)) + '?page=2',
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            self.assertIndexedPlans(self.auth, url)
+
+    def test_next_page_plans(self) -> None:
+        """Проверяем планы запросов следующих страниц по курсору."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+        ):
+            cursor = self.auth.get(url).context['page_obj'].next_cursor
+            self.assertIndexedPlans(self.auth, f'{url}?cursor={cursor}')
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_merged_timeline_plans(self) -> None:
+        """Проверяем планы запросов ленты с подмешиваемыми авторами."""
+        url = reverse('posts:follow_index')
+        cursor = self.auth.get(url).context['page_obj'].next_cursor
+        self.assertIndexedPlans(self.auth, url, merged=True)
+        self.assertIndexedPlans(
+            self.auth,
+            f'{url}?cursor={cursor}',
+            merged=True,
+        )
+
+    def test_follow_plans(self) -> None:
+        """Проверяем планы запросов подписки и отписки."""
+        for name in ('posts:profile_unfollow', 'posts:profile_follow'):
+            self.assertIndexedPlans(
+                self.auth,
+                reverse(name, args=(self.author.username,)),
+            )
+
+    def test_post_plans(self) -> None:
+        """Проверяем планы запросов страниц поста."""
+        for url in (
+            reverse('posts:post_detail', args=(self.posts[0].pk,)),
+            reverse('posts:post_edit', args=(self.posts[0].pk,)),
+        ):
+            self.assertIndexedPlans(self.auth, url)
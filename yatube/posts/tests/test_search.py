@@ -0,0 +1,117 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+from testdata import wrap_testdata
+
+from posts.models import Comment, Post, User
+from posts.search import search_posts
+
+
+class SearchTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.author = mixer.blend(User)
+        cls.best = mixer.blend(
+            Post,
+            author=cls.author,
+            text='Ёжик в тумане, туман над рекой, туманное утро',
+            image=None,
+        )
+        cls.other = mixer.blend(
+            Post,
+            author=cls.author,
+            text='Про туман и <script>alert(1)</script> немного',
+            image=None,
+        )
+        cls.unrelated = mixer.blend(
+            Post,
+            author=cls.author,
+            text='Совсем другая история',
+            image=None,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_ranked_prefix_search(self) -> None:
+        """Проверяем поиск по префиксам слов с сортировкой по релевантности."""
+        self.assertEqual(
+            list(search_posts('туман')),
+            [self.best, self.other],
+        )
+        self.assertEqual(list(search_posts('ёжик туман')), [self.best])
+
+    def test_query_operators_are_ignored(self) -> None:
+        """Проверяем, что синтаксис FTS5 во вводе не ломает поиск."""
+        for query in ('"туман', 'туман AND (', 'NEAR(туман', '*', ''):
+            with self.subTest(query=query):
+                list(search_posts(query))
+
+    def test_index_follows_changes(self) -> None:
+        """Проверяем, что индекс следует за изменением и удалением постов."""
+        self.unrelated.text = 'Туманная история'
+        self.unrelated.save()
+        self.assertIn(self.unrelated, search_posts('туманная'))
+        self.other.delete()
+        self.assertNotIn(self.other, search_posts('туман'))
+        self.assertFalse(search_posts('другая').exists())
+
+    def test_search_page(self) -> None:
+        """Проверяем страницу поиска: фрагменты выделены и экранированы."""
+        response = self.client.get(reverse('posts:search'), {'q': 'туман'})
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.best, self.other],
+        )
+        content = response.content.decode()
+        self.assertIn('<mark>туман</mark>', content)
+        self.assertIn('&lt;script&gt;', content)
+        self.assertNotIn('<script>alert', content)
+
+    def test_pagination_keeps_query(self) -> None:
+        """Проверяем, что ссылки пагинатора сохраняют строку поиска."""
+        mixer.cycle(12).blend(
+            Post,
+            author=self.author,
+            text='туман',
+            image=None,
+        )
+        response = self.client.get(reverse('posts:search'), {'q': 'туман'})
+        self.assertContains(
+            response,
+            'href="?q=%D1%82%D1%83%D0%BC%D0%B0%D0%BD&amp;page=2"',
+        )
+
+
+class AdminSearchTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.admin = mixer.blend(User, is_staff=True, is_superuser=True)
+        cls.client_admin = Client()
+        cls.client_admin.force_login(cls.admin)
+        cls.post = mixer.blend(Post, text='Северное сияние', image=None)
+        mixer.blend(Post, text='Южный ветер', image=None)
+        cls.comment = mixer.blend(
+            Comment,
+            post=cls.post,
+            text='Красивое сияние',
+        )
+        mixer.blend(Comment, post=cls.post, text='Холодно')
+
+    def test_admin_search_uses_index(self) -> None:
+        """Проверяем поиск в админке по полнотекстовому индексу."""
+        for model, obj in ((Post, self.post), (Comment, self.comment)):
+            with self.subTest(model=model.__name__):
+                response = self.client_admin.get(
+                    reverse(
+                        f'admin:posts_{model._meta.model_name}_changelist',
+                    ),
+                    {'q': 'сиян'},
+                )
+                self.assertEqual(
+                    list(response.context['cl'].result_list),
+                    [obj],
+                )
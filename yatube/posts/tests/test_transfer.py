@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from mixer.backend.django import mixer
+
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+from posts.search import search_posts
+
+
+class TransferTest(TestCase):
+    def setUp(self) -> None:
+        self.user, self.author = mixer.cycle(2).blend(User)
+        self.group = mixer.blend(Group)
+        self.posts = mixer.cycle(3).blend(
+            Post,
+            author=self.author,
+            group=self.group,
+            image=None,
+            thumbnail='',
+            variants='',
+        )
+        mixer.cycle(2).blend(Comment, post=self.posts[0], author=self.user)
+        Follow.objects.create(user=self.user, author=self.author)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'dump.jsonl')
+
+    def snapshot(self) -> dict:
+        return {
+            model: list(model.objects.order_by('pk').values())
+            for model in (User, Group, Post, Comment, Follow)
+        }
+
+    def export(self) -> None:
+        call_command('export_jsonl', self.path, verbosity=0, stderr=StringIO())
+
+    def load(self, **options) -> None:
+        call_command(
+            'import_jsonl',
+            self.path,
+            verbosity=0,
+            stderr=StringIO(),
+            **options,
+        )
+
+    def test_round_trip(self) -> None:
+        """Проверяем, что выгрузка и загрузка сохраняют данные и даты."""
+        expected = self.snapshot()
+        self.export()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.load(chunk_size=2, batch_size=1)
+        self.assertEqual(self.snapshot(), expected)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).followers_count,
+            1,
+        )
+        self.assertIn(self.posts[1], search_posts(self.posts[1].text))
+
+    def test_export_to_stdout(self) -> None:
+        """Проверяем формат строк выгрузки в стандартный вывод."""
+        out = StringIO()
+        call_command(
+            'export_jsonl',
+            '-',
+            verbosity=0,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [row['model'] for row in rows],
+            ['auth.user'] * 2
+            + ['posts.group']
+            + ['posts.post'] * 3
+            + ['posts.comment'] * 2
+            + ['posts.follow'],
+        )
+        self.assertNotIn('comments_count', rows[3]['fields'])
+
+    def test_resume_from_checkpoint(self) -> None:
+        """Проверяем, что загрузка продолжается с контрольной точки."""
+        self.export()
+        Comment.objects.all().delete()
+        Follow.objects.all().delete()
+        with open(f'{self.path}.checkpoint', 'w') as file:
+            file.write('8')
+        self.load()
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+        self.load(restart=True)
+        self.assertEqual(Comment.objects.count(), 2)
@@ -1,11 +1,23 @@
+import shutil
+import tempfile
+from http import HTTPStatus
+
 from django import forms
 from django.conf import settings
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from mixer.backend.django import mixer
+from sorl.thumbnail import get_thumbnail
 from testdata import wrap_testdata
 
-from posts.models import Follow, Group, Post, User
+from core.cache import get_version
+from posts import thumbnails
+from posts.models import Comment, Follow, Group, Post, TimelineEntry, User
+from posts.tests.common import get_image
+from posts.timeline import TimelinePaginator
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
 class YatubePagesTests(TestCase):
@@ -251,6 +263,126 @@ class PaginatorViewsTest(TestCase):
                     message,
                 )
 
+    def test_cursor_paginator(self) -> None:
+        """Проверяем переходы по курсорам вперёд и назад."""
+        for name, url in self.urls.items():
+            with self.subTest(url=url):
+                first = self.auth.get(url).context['page_obj']
+                second = self.auth.get(
+                    f'{url}?cursor={first.next_cursor}',
+                ).context['page_obj']
+                back = self.auth.get(
+                    f'{url}?cursor={second.previous_cursor}',
+                ).context['page_obj']
+                self.assertEqual(
+                    (len(first), len(second)),
+                    (settings.PAGINATION, 5),
+                    f'Неверное количество постов на страницах {name}',
+                )
+                self.assertFalse(
+                    {post.pk for post in first} & {post.pk for post in second},
+                    f'Страницы {name} пересекаются',
+                )
+                self.assertEqual(
+                    [post.pk for post in back],
+                    [post.pk for post in first],
+                    f'Неверная предыдущая страница {name}',
+                )
+                self.assertEqual(
+                    (second.next_cursor, back.previous_cursor),
+                    ('', ''),
+                    f'Лишние ссылки пагинации {name}',
+                )
+
+    def test_invalid_cursor(self) -> None:
+        """Проверяем, что битый курсор ведёт на первую страницу."""
+        self.assertEqual(
+            len(
+                self.auth.get(
+                    self.urls['index'] + '?cursor=broken',
+                ).context['page_obj'],
+            ),
+            settings.PAGINATION,
+            'Битый курсор не ведёт на первую страницу',
+        )
+
+    def test_page_count_cache(self) -> None:
+        """Проверяем кэш числа постов и его сброс при новом посте."""
+        cache.clear()
+        url = self.urls['index'] + '?page=2'
+        self.auth.get(url)
+        with self.assertNumQueries(3):
+            self.auth.get(url)
+        mixer.blend(Post, author=self.user, image=None)
+        self.assertEqual(
+            self.auth.get(url).context['page_obj'].paginator.count,
+            len(self.posts) + 1,
+            'Число постов не сбрасывается при создании поста',
+        )
+
+    @override_settings(PAGINATION_WINDOW=1)
+    def test_page_window(self) -> None:
+        """Проверяем, что выводятся только соседние номера страниц."""
+        mixer.cycle(30).blend(Post, author=self.user, image=None)
+        response = self.auth.get(self.urls['index'] + '?page=3')
+        for number, expected in ((2, True), (4, True), (1, False), (5, False)):
+            with self.subTest(number=number):
+                self.assertEqual(
+                    f'>{number}</a>' in response.content.decode(),
+                    expected,
+                    f'Неверное окно ссылок пагинатора для страницы {number}',
+                )
+
+
+@override_settings(COMMENTS_PAGINATION=4)
+class CommentsPaginationTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.post = mixer.blend(Post, image=None)
+        cls.comments = mixer.cycle(6).blend(Comment, post=cls.post)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_first_batch(self) -> None:
+        """Проверяем, что страница поста показывает первую порцию."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+        page = response.context['comments']
+        self.assertEqual(
+            list(page),
+            sorted(
+                self.comments,
+                key=lambda comment: (comment.created, comment.pk),
+                reverse=True,
+            )[:4],
+        )
+        self.assertContains(
+            response,
+            '{}?cursor={}'.format(
+                reverse('posts:comments', args=(self.post.pk,)),
+                page.next_cursor,
+            ),
+        )
+
+    def test_load_more_fragment(self) -> None:
+        """Проверяем фрагмент со следующей порцией комментариев."""
+        first = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        ).context['comments']
+        response = self.client.get(
+            reverse('posts:comments', args=(self.post.pk,)),
+            {'cursor': first.next_cursor},
+        )
+        rest = response.context['comments']
+        self.assertEqual(len(rest), 2)
+        self.assertFalse(set(rest) & set(first))
+        self.assertFalse(rest.next_cursor)
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertNotContains(response, 'js-more-comments')
+
 
 class CacheTest(TestCase):
     def test_home_cache(self) -> None:
@@ -271,6 +403,243 @@ class CacheTest(TestCase):
             'Неверный текст поста после кэширования',
         )
 
+    def test_home_cache_invalidation(self) -> None:
+        """Проверяем, что сохранённый пост сразу попадает в ленту."""
+        self.client.get(reverse('posts:index'))
+        post = mixer.blend(Post, image=None)
+        self.assertEqual(
+            self.client.get(reverse('posts:index')).context['page_obj'][0],
+            post,
+            'Новый пост не появился в закэшированной ленте',
+        )
+
+    def test_login_keeps_cache(self) -> None:
+        """Проверяем, что вход пользователя не сбрасывает кэш лент."""
+        user = User.objects.create_user('reader', password='secret')
+        version = get_version('feed')
+        self.client.login(username='reader', password='secret')
+        self.assertEqual(
+            get_version('feed'),
+            version,
+            'Вход пользователя сбросил кэш лент',
+        )
+        user.first_name = 'Читатель'
+        user.save()
+        self.assertNotEqual(
+            get_version('feed'),
+            version,
+            'Смена имени автора не сбросила кэш лент',
+        )
+
+    def test_home_cache_pages(self) -> None:
+        """Проверяем, что страницы ленты кэшируются раздельно."""
+        mixer.cycle(settings.PAGINATION + 1).blend(Post, image=None)
+        first = self.client.get(reverse('posts:index')).context['page_obj']
+        second = self.client.get(
+            reverse('posts:index') + f'?cursor={first.next_cursor}',
+        ).context['page_obj']
+        self.assertNotEqual(
+            first[0],
+            second[0],
+            'Вторая страница ленты отдаётся из кэша первой',
+        )
+
+
+class CardCacheTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.group = mixer.blend(Group)
+        cls.post = mixer.blend(Post, group=cls.group, image=None)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_cards_cached(self) -> None:
+        """Проверяем, что карточки повторно берутся из кэша."""
+        self.assertTemplateUsed(
+            self.client.get(reverse('posts:index')),
+            'posts/includes/post.html',
+            'Карточка поста не отрендерилась',
+        )
+        self.assertTemplateNotUsed(
+            self.client.get(reverse('posts:index') + '?cursor='),
+            'posts/includes/post.html',
+            'Карточка поста рендерится повторно',
+        )
+
+    def test_cards_invalidation(self) -> None:
+        """Проверяем, что карточка обновляется при изменении группы."""
+        self.client.get(reverse('posts:index'))
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(
+            self.client.get(reverse('posts:index')),
+            'Новое название',
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailPrefetchTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_prefetch(self) -> None:
+        """Проверяем, что миниатюры страницы ищутся одним запросом."""
+        posts = [
+            mixer.blend(
+                Post,
+                image=get_image(f'image_{i}.gif'),
+                thumbnail='',
+            )
+            for i in range(3)
+        ]
+        expected = [
+            get_thumbnail(
+                post.image,
+                settings.POST_THUMBNAIL_GEOMETRY,
+                **settings.POST_THUMBNAIL_OPTIONS,
+            ).name
+            for post in posts
+        ]
+        cache.clear()
+        with self.assertNumQueries(1):
+            thumbnails.prefetch(posts)
+        with self.assertNumQueries(0):
+            thumbnails.prefetch(posts)
+        self.assertEqual(
+            [post.thumbnail.name for post in posts],
+            expected,
+            'Готовые миниатюры не подставлены в посты',
+        )
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    @wrap_testdata
+    def setUpTestData(cls):
+        cls.user, cls.auth = mixer.blend(User), Client()
+        cls.auth.force_login(cls.user)
+        cls.group = mixer.blend(Group)
+        cls.post = mixer.blend(
+            Post,
+            author=cls.user,
+            group=cls.group,
+            image=None,
+        )
+        cls.urls = {
+            'detail': reverse('posts:post_detail', args=(cls.post.pk,)),
+            'group': reverse('posts:group_list', args=(cls.group.slug,)),
+            'index': reverse('posts:index'),
+            'profile': reverse('posts:profile', args=(cls.user.username,)),
+        }
+
+    def test_not_modified(self) -> None:
+        """Проверяем ответ 304 без запросов к ленте."""
+        for name, url in self.urls.items():
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(
+                    response.status_code,
+                    HTTPStatus.NOT_MODIFIED,
+                    f'Страница {name} не отвечает 304 на повторный запрос',
+                )
+
+    def test_modified_after_changes(self) -> None:
+        """Проверяем, что ETag меняется после изменения данных."""
+        changes = (
+            ('index', lambda: mixer.blend(Post, image=None)),
+            ('detail', lambda: mixer.blend(Comment, post=self.post)),
+            (
+                'profile',
+                lambda: Follow.objects.create(
+                    user=mixer.blend(User),
+                    author=self.user,
+                ),
+            ),
+        )
+        for name, change in changes:
+            with self.subTest(name=name):
+                etag = self.client.get(self.urls[name])['ETag']
+                change()
+                self.assertEqual(
+                    self.client.get(
+                        self.urls[name],
+                        HTTP_IF_NONE_MATCH=etag,
+                    ).status_code,
+                    HTTPStatus.OK,
+                    f'Страница {name} не обновилась после изменений',
+                )
+
+    def test_last_modified_after_changes(self) -> None:
+        """Проверяем Last-Modified после изменений без новых дат записей."""
+        other = mixer.blend(Post, group=self.group, image=None)
+        comment = mixer.blend(Comment, post=self.post)
+        changes = (
+            ('index', other.delete),
+            ('detail', comment.delete),
+            (
+                'group',
+                lambda: setattr(self.group, 'title', 'Новое название')
+                or self.group.save(),
+            ),
+            (
+                'profile',
+                lambda: Follow.objects.create(
+                    user=mixer.blend(User),
+                    author=self.user,
+                ),
+            ),
+        )
+        for name, change in changes:
+            with self.subTest(name=name):
+                last_modified = self.client.get(self.urls[name])[
+                    'Last-Modified'
+                ]
+                change()
+                self.assertEqual(
+                    self.client.get(
+                        self.urls[name],
+                        HTTP_IF_MODIFIED_SINCE=last_modified,
+                    ).status_code,
+                    HTTPStatus.OK,
+                    f'Страница {name} отвечает 304 после изменений',
+                )
+
+    def test_etag_depends_on_user(self) -> None:
+        """Проверяем, что ETag гостя не подходит пользователю."""
+        etag = self.client.get(self.urls['index'])['ETag']
+        self.assertEqual(
+            self.auth.get(
+                self.urls['index'],
+                HTTP_IF_NONE_MATCH=etag,
+            ).status_code,
+            HTTPStatus.OK,
+            'Пользователь получает страницу гостя из кэша клиента',
+        )
+
+    def test_etag_depends_on_csrf_token(self) -> None:
+        """Проверяем, что после нового входа форма приходит с новым токеном."""
+        user = User.objects.create_user('reader', password='password')
+        client = Client()
+        credentials = {'username': user.username, 'password': 'password'}
+        client.post(reverse('users:login'), credentials)
+        etag = client.get(self.urls['detail'])['ETag']
+        client.get(reverse('users:logout'))
+        client.post(reverse('users:login'), credentials)
+        self.assertEqual(
+            client.get(
+                self.urls['detail'],
+                HTTP_IF_NONE_MATCH=etag,
+            ).status_code,
+            HTTPStatus.OK,
+            'После входа форма отдана из кэша со старым CSRF-токеном',
+        )
+
 
 class FollowViewTest(TestCase):
     @classmethod
@@ -328,3 +697,83 @@ class FollowViewTest(TestCase):
             'Пост автора, на которого не подписан пользователь есть '
             'в ленте подписок',
         )
+
+    def test_following_feed_new_post(self) -> None:
+        """Проверяем, что новый пост автора попадает в ленту подписчика."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = mixer.blend(Post, author=self.author, image=None)
+        self.assertEqual(
+            self.follower_client.get(reverse('posts:follow_index')).context[
+                'page_obj'
+            ][0],
+            post,
+            'Новый пост автора отсутствует в ленте подписок',
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.follower,
+                post=post,
+            ).exists(),
+            'Новый пост не разложен по лентам подписчиков',
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_following_feed_merged_author(self) -> None:
+        """Проверяем ленту с авторами, посты которых не раскладываются."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        mixer.blend(Post, author=self.author, image=None)
+        self.assertFalse(
+            TimelineEntry.objects.exists(),
+            'Посты популярного автора раскладываются по лентам',
+        )
+        self.assertEqual(
+            self.follower_client.get(reverse('posts:follow_index'))
+            .context['page_obj']
+            .__len__(),
+            2,
+            'Посты популярного автора отсутствуют в ленте подписок',
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_merged_authors_read_at_once(self) -> None:
+        """Проверяем, что посты популярных авторов читаются одним запросом."""
+        authors = mixer.cycle(3).blend(User)
+        for author in authors:
+            Follow.objects.create(user=self.follower, author=author)
+        posts = [
+            mixer.blend(Post, author=author, image=None)
+            for author in (*authors, *authors)
+        ]
+        paginator = TimelinePaginator(self.follower, 4)
+        with self.assertNumQueries(3):
+            page = paginator.get_page(None)
+        self.assertEqual(
+            list(page),
+            posts[::-1][:4],
+            'Посты популярных авторов перемешаны в ленте подписок',
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_drops_below_fanout_limit(self) -> None:
+        """Проверяем ленту, когда автор теряет подписчиков до порога."""
+        other = mixer.blend(User)
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        post = mixer.blend(Post, author=self.author, image=None)
+        Follow.objects.get(user=other).delete()
+        self.assertIn(
+            post,
+            self.follower_client.get(reverse('posts:follow_index')).context[
+                'page_obj'
+            ],
+            'Пост исчез из ленты после отписки другого подписчика',
+        )
+
+    def test_unfollow_trims_feed(self) -> None:
+        """Проверяем, что после отписки лента очищается от постов автора."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Follow.objects.get(user=self.follower).delete()
+        self.assertFalse(
+            self.follower.timeline.exists(),
+            'Посты автора остались в ленте после отписки',
+        )
@@ -0,0 +1,140 @@
+from pathlib import PurePosixPath
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from core.paginator import invalidate_feeds
+from core.tasks import run_in_background
+from posts import images, media
+from posts.models import Post
+
+FALLBACK_WIDTH = int(settings.POST_THUMBNAIL_GEOMETRY.split('x')[0])
+
+
+def generate(pk: int) -> None:
+    """Обрабатывает картинку поста и строит её миниатюры.
+
+    Картинка декодируется один раз: исходник при необходимости
+    поворачивается по EXIF, очищается от метаданных и уменьшается,
+    затем из него вырезаются варианты миниатюры в WebP для `srcset`
+    и миниатюра в JPEG для браузеров без WebP. Шаблоны выводят только
+    сохранённые пути и не обращаются к Pillow во время рендеринга.
+    """
+    post = Post.objects.filter(pk=pk).only('image').first()
+    if post is None:
+        return
+    fields = {'thumbnail': '', 'variants': ''}
+    if post.image:
+        storage, name = post.thumbnail.storage, post.image.name
+        image, image_format, extension, changed = images.load(post.image)
+        if changed:
+            # Имя строится от `upload_to`, а не от пути исходника: иначе
+            # хранилище добавит уровни каталогов поверх уже имеющихся.
+            name = post.image.storage.save(
+                str(
+                    PurePosixPath(post.image.field.upload_to)
+                    / (PurePosixPath(name).stem + extension),
+                ),
+                images.encode(image, image_format),
+            )
+        thumbnail = storage.save(
+            media.CARDS_DIR + PurePosixPath(name).stem + '.jpg',
+            images.encode(images.crop(image, FALLBACK_WIDTH), 'JPEG'),
+        )
+        variants = []
+        for width in settings.POST_IMAGE_WIDTHS:
+            # Имя варианта выводится из имени миниатюры: по нему сборщик
+            # забытых файлов находит пост, которому вариант принадлежит.
+            variant = (
+                f'{PurePosixPath(thumbnail).with_suffix("")}_{width}.webp'
+            )
+            storage.delete(variant)
+            storage.save(
+                variant,
+                images.encode(images.crop(image, width), 'WEBP'),
+            )
+            variants.append(f'{variant} {width}')
+        fields = {
+            'image': name,
+            'thumbnail': thumbnail,
+            'variants': '\n'.join(variants),
+        }
+    Post.objects.filter(pk=pk).update(**fields)
+    if fields.get('image', post.image.name) != post.image.name:
+        media.acquire(fields['image'])
+        media.release(post.image.name)
+    invalidate_feeds()
+
+
+def schedule(post: Post) -> None:
+    """Ставит построение миниатюры поста в фоновую очередь."""
+    run_in_background(generate, post.pk)
+
+
+def thumbnail_name(image: FieldFile) -> str:
+    """Вычисляет имя миниатюры sorl-thumbnail, не открывая картинку.
+
+    Повторяет сборку опций из `ThumbnailBackend.get_thumbnail`.
+    """
+    options = dict(settings.POST_THUMBNAIL_OPTIONS)
+    for key, value in default.backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in default.backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    return default.backend._get_thumbnail_filename(
+        ImageFile(image),
+        settings.POST_THUMBNAIL_GEOMETRY,
+        options,
+    )
+
+
+def prefetch(posts: Iterable[Post]) -> None:
+    """Подставляет постам без сохранённой миниатюры готовые из sorl.
+
+    Все миниатюры страницы ищутся в хранилище ключей sorl-thumbnail
+    одним `get_many` к кэшу и не больше чем одним запросом к базе
+    вместо отдельного обращения на каждый пост. Посты, для которых
+    миниатюра ещё не построена, выводятся с исходной картинкой.
+    """
+    names = {
+        post: thumbnail_name(post.image)
+        for post in posts
+        if post.image and not post.thumbnail
+    }
+    keys = {
+        add_prefix(ImageFile(name, default.storage).key): name
+        for name in names.values()
+    }
+    if not keys:
+        return
+    found = {
+        key
+        for key, value in default.kvstore.cache.get_many(keys).items()
+        if isinstance(value, str)
+    }
+    missing = set(keys) - found
+    if missing:
+        stored = dict(
+            KVStore.objects.filter(key__in=missing).values_list(
+                'key',
+                'value',
+            ),
+        )
+        default.kvstore.cache.set_many(
+            stored,
+            thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT,
+        )
+        found.update(stored)
+    ready = {keys[key] for key in found}
+    for post, name in names.items():
+        if name in ready:
+            post.thumbnail = name
@@ -0,0 +1,149 @@
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+
+from core.paginator import NEXT, CursorPaginator, keyset
+from posts.models import AuthorStats, Follow, Post, TimelineEntry, User
+
+
+def is_fanned_out(author: User) -> bool:
+    """Проверяет, раскладываются ли посты автора по лентам при записи."""
+    return not AuthorStats.objects.filter(
+        user=author,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).exists()
+
+
+def merged_authors(user: User) -> QuerySet:
+    """Возвращает авторов, чьи посты подмешиваются в ленту при чтении."""
+    return Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values('author')
+
+
+def fan_out(post: Post) -> None:
+    """Добавляет новый пост в ленты подписчиков автора."""
+    if not is_fanned_out(post.author):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, created=post.created)
+            for user_id in post.author.following.values_list(
+                'user',
+                flat=True,
+            )
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def backfill(follow: Follow) -> None:
+    """Добавляет в ленту подписчика последние посты нового автора."""
+    if not is_fanned_out(follow.author):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user=follow.user, post_id=pk, created=created)
+            for pk, created in follow.author.posts.order_by(
+                '-created',
+            ).values_list('pk', 'created')[: settings.TIMELINE_BACKFILL]
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def refill(author_id: int) -> None:
+    """Раскладывает последние посты автора по лентам всех подписчиков.
+
+    Нужно, когда число подписчиков автора опускается до
+    `TIMELINE_FANOUT_LIMIT`: его посты больше не подмешиваются при
+    чтении, а написанные выше порога не были разложены по лентам.
+    """
+    posts = list(
+        Post.objects.filter(author_id=author_id)
+        .order_by('-created')
+        .values_list('pk', 'created')[: settings.TIMELINE_BACKFILL],
+    )
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user',
+        flat=True,
+    )
+    for user_id in followers.iterator():
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(user_id=user_id, post_id=pk, created=created)
+                for pk, created in posts
+            ),
+            ignore_conflicts=True,
+        )
+
+
+def trim(follow: Follow) -> None:
+    """Убирает из ленты подписчика посты автора, от которого он отписался."""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id,
+        post__author_id=follow.author_id,
+    ).delete()
+
+
+class TimelinePaginator(CursorPaginator):
+    """Курсорный пагинатор ленты подписок пользователя.
+
+    Идентификаторы постов читаются диапазоном по индексу ленты, а посты
+    авторов с большим числом подписчиков подмешиваются при чтении.
+    """
+
+    def __init__(
+        self,
+        user: User,
+        per_page: int,
+        posts: Optional[QuerySet] = None,
+    ) -> None:
+        if posts is None:
+            posts = Post.objects.select_related('author', 'group')
+        super().__init__(posts, per_page)
+        self.user = user
+
+    def _slice(
+        self,
+        key: Optional[Tuple[object, int]],
+        direction: str,
+        limit: int,
+    ) -> list:
+        ids = list(
+            keyset(
+                self.user.timeline.all(),
+                key,
+                direction,
+                ('created', 'post_id'),
+            ).values_list('post_id', flat=True)[:limit],
+        )
+        posts = self.object_list.in_bulk(ids)
+        items = {pk: posts[pk] for pk in ids if pk in posts}
+        authors = list(
+            merged_authors(self.user).values_list('author', flat=True),
+        )
+        if authors:
+            merged = keyset(
+                self.object_list.filter(author_id__in=authors),
+                key,
+                direction,
+            )
+            if len(items) == limit:
+                # Посты дальше последнего поста ленты на страницу не
+                # попадут, поэтому диапазон по индексу `(author, created)`
+                # и сортировка ограничены окном страницы.
+                edge = items[ids[-1]].created
+                lookup = 'gte' if direction == NEXT else 'lte'
+                merged = merged.filter(**{f'created__{lookup}': edge})
+            # Посты всех подмешиваемых авторов читаются одним запросом
+            # и сливаются с лентой в памяти.
+            for post in merged[:limit]:
+                items.setdefault(post.pk, post)
+        return sorted(
+            items.values(),
+            key=lambda post: (post.created, post.pk),
+            reverse=direction == NEXT,
+        )[:limit]
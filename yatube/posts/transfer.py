@@ -0,0 +1,116 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from core.paginator import invalidate_counts, invalidate_feeds
+from posts import counters, media
+from posts.models import Comment, Follow, Group, Post, User
+
+# Модели в порядке, при котором связи ведут на уже загруженные строки.
+MODELS = (User, Group, Post, Comment, Follow)
+
+# Поля, которые пересчитываются или строятся заново после загрузки.
+DERIVED_FIELDS = {'posts_count', 'comments_count', 'thumbnail', 'variants'}
+
+LABELS = {model._meta.label_lower: model for model in MODELS}
+
+
+class Encoder(DjangoJSONEncoder):
+    """Кодирует даты с микросекундами, не обрезая их до миллисекунд."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class UnknownModel(ValueError):
+    """Строка файла относится к модели, которую нельзя загрузить."""
+
+
+def fields_of(model) -> List[models.Field]:
+    """Возвращает переносимые поля модели, кроме первичного ключа."""
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in DERIVED_FIELDS
+    ]
+
+
+def dump(model, chunk_size: int) -> Iterator[str]:
+    """Построчно выгружает записи модели в формате JSONL.
+
+    Строки читаются курсором порциями по `chunk_size` без создания
+    объектов моделей, поэтому память не зависит от размера таблицы.
+    Формат строки совпадает с сериализатором `dumpdata`.
+    """
+    fields = fields_of(model)
+    names = [field.name for field in fields]
+    rows = (
+        model._base_manager.order_by('pk')
+        .values_list('pk', *(field.attname for field in fields))
+        .iterator(chunk_size=chunk_size)
+    )
+    label = model._meta.label_lower
+    for pk, *values in rows:
+        yield json.dumps(
+            {'model': label, 'pk': pk, 'fields': dict(zip(names, values))},
+            cls=Encoder,
+            ensure_ascii=False,
+        )
+
+
+def parse(line: str) -> models.Model:
+    """Создаёт несохранённый объект модели из строки JSONL."""
+    data = json.loads(line)
+    model = LABELS.get(data.get('model'))
+    if model is None:
+        raise UnknownModel(data.get('model'))
+    fields = {field.name: field for field in fields_of(model)}
+    return model(
+        pk=data['pk'],
+        **{
+            fields[name].attname: fields[name].to_python(value)
+            for name, value in data['fields'].items()
+            if name in fields
+        },
+    )
+
+
+@contextmanager
+def kept_timestamps() -> Iterator[None]:
+    """Отключает `auto_now` и `auto_now_add`, чтобы сохранить даты из файла.
+
+    `bulk_create` вызывает `pre_save` полей, который иначе заменил бы
+    даты создания постов и комментариев текущим временем.
+    """
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in MODELS
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.DateField)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def finish() -> None:
+    """Пересчитывает производные данные после массовой загрузки.
+
+    `bulk_create` не отправляет сигналы, поэтому счётчики, учёт ссылок
+    на картинки и кэш лент обновляются здесь одним проходом.
+    """
+    counters.recount_all()
+    media.recount_refs()
+    for model in MODELS:
+        invalidate_counts(model)
+    invalidate_feeds()
@@ -1,23 +1,46 @@
 from django.urls import path
 
-from posts import views
+from posts import feeds, views
 
 app_name = '%(app_label)s'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('rss/', feeds.index_rss, name='index_rss'),
+    path('atom/', feeds.index_atom, name='index_atom'),
     path(
         'posts/<int:pk>/comment/',
         views.add_comment,
         name='add_comment',
     ),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
     path('create/', views.post_create, name='post_create'),
+    path('search/', views.post_search, name='search'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('export/', views.profile_export, name='profile_export'),
+    path('new/', views.new_posts, name='new_posts'),
+    path('new/stream/', views.new_posts_stream, name='new_posts_stream'),
     path('posts/<int:pk>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:pk>/comments/',
+        views.post_comments,
+        name='comments',
+    ),
     path('posts/<int:pk>/delete/', views.post_delete, name='post_delete'),
     path('posts/<int:pk>/edit/', views.post_edit, name='post_edit'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.profile_rss,
+        name='profile_rss',
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.profile_atom,
+        name='profile_atom',
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
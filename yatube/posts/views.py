@@ -1,13 +1,34 @@
+from typing import Tuple
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Page
+from django.db.models.query import QuerySet
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import condition, require_safe
 
+from core.paginator import CachedCountPaginator, CursorPaginator
+from core.queries import query_budget
 from core.utils import paginate
+from posts import conditions, export, live, search, thumbnails
 from posts.forms import CommentForm, PostForm
-from posts.models import Follow, Group, Post, User
+from posts.models import Comment, Follow, Group, Post, User
+from posts.timeline import TimelinePaginator
 
 
+@query_budget(6)
+@condition(
+    etag_func=conditions.index_etag,
+    last_modified_func=conditions.index_last_modified,
+)
 def index(request: HttpRequest) -> HttpResponse:
     """Создаёт главную страницу.
 
@@ -18,7 +39,7 @@ def index(request: HttpRequest) -> HttpResponse:
         HTML-код страницы.
     """
     posts = Post.objects.select_related('author', 'group')
-    page = paginate(request, posts, settings.PAGINATION)
+    page = paginate(request, posts, settings.PAGINATION, 'index')
 
     return render(
         request,
@@ -30,6 +51,11 @@ def index(request: HttpRequest) -> HttpResponse:
     )
 
 
+@query_budget(6)
+@condition(
+    etag_func=conditions.group_etag,
+    last_modified_func=conditions.group_last_modified,
+)
 def group_posts(request: HttpRequest, slug: str) -> HttpResponse:
     """Создаёт страницу группы записей.
 
@@ -42,7 +68,12 @@ def group_posts(request: HttpRequest, slug: str) -> HttpResponse:
     """
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.select_related('author')
-    page = paginate(request, posts, settings.PAGINATION)
+    page = paginate(
+        request,
+        posts,
+        settings.PAGINATION,
+        f'group:{group.pk}',
+    )
     return render(
         request,
         'posts/group_list.html',
@@ -53,6 +84,11 @@ def group_posts(request: HttpRequest, slug: str) -> HttpResponse:
     )
 
 
+@query_budget(8)
+@condition(
+    etag_func=conditions.profile_etag,
+    last_modified_func=conditions.profile_last_modified,
+)
 def profile(request: HttpRequest, username: str) -> HttpResponse:
     """Создаёт страницу профиля автора.
 
@@ -63,9 +99,17 @@ def profile(request: HttpRequest, username: str) -> HttpResponse:
     Returns:
         HTML-код страницы.
     """
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username,
+    )
     posts = author.posts.select_related('author', 'group')
-    page = paginate(request, posts, settings.PAGINATION)
+    page = paginate(
+        request,
+        posts,
+        settings.PAGINATION,
+        f'profile:{author.pk}',
+    )
     following = (
         request.user.is_authenticated
         and author.following.filter(user=request.user).exists()
@@ -81,6 +125,69 @@ def profile(request: HttpRequest, username: str) -> HttpResponse:
     )
 
 
+def live_feed(request: HttpRequest) -> Tuple[QuerySet, int]:
+    """Разбирает ленту и границу `since` запроса о новых постах."""
+    feed = request.GET.get('feed', 'index')
+    if feed not in live.FEEDS:
+        raise Http404
+    if feed == 'follow' and not request.user.is_authenticated:
+        raise PermissionDenied
+    try:
+        since = int(request.GET.get('since', ''))
+    except ValueError:
+        raise Http404
+    return (
+        live.feed_posts(feed, request.GET.get('slug'), request.user),
+        since,
+    )
+
+
+@query_budget(4)
+@require_safe
+def new_posts(request: HttpRequest) -> JsonResponse:
+    """Отдаёт число постов ленты новее `since` для плашки «Новые записи».
+
+    Args:
+        request: Запрос с лентой `feed` (`index`, `group` со `slug`
+            или `follow`) и идентификатором последнего поста `since`.
+
+    Returns:
+        JSON с числом новых постов и наибольшим идентификатором поста.
+    """
+    return JsonResponse(live.count_new(*live_feed(request)))
+
+
+@require_safe
+def new_posts_stream(request: HttpRequest) -> StreamingHttpResponse:
+    """Отдаёт поток SSE с числом новых постов ленты.
+
+    Параметры запроса те же, что у `new_posts`. Без `LIVE_STREAM_ENABLED`
+    поток недоступен.
+    """
+    if not settings.LIVE_STREAM_ENABLED:
+        raise Http404
+    response = StreamingHttpResponse(
+        live.stream(*live_feed(request)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def comments_page(request: HttpRequest, pk: int) -> Page:
+    """Возвращает порцию комментариев поста по курсору из запроса."""
+    return CursorPaginator(
+        Comment.objects.filter(post_id=pk).select_related('author'),
+        settings.COMMENTS_PAGINATION,
+    ).get_page(request.GET.get('cursor'))
+
+
+@query_budget(7)
+@condition(
+    etag_func=conditions.post_detail_etag,
+    last_modified_func=conditions.post_last_modified,
+)
 def post_detail(request: HttpRequest, pk: int) -> HttpResponse:
     """Создаёт страницу записи.
 
@@ -91,19 +198,74 @@ def post_detail(request: HttpRequest, pk: int) -> HttpResponse:
     Returns:
         HTML-код страницы.
     """
-    post = get_object_or_404(Post, pk=pk)
-    comments = post.comments.select_related('author')
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'),
+        pk=pk,
+    )
+    thumbnails.prefetch([post])
     return render(
         request,
         'posts/post_detail.html',
         {
-            'post': get_object_or_404(Post, pk=pk),
+            'post': post,
             'form': CommentForm(request.POST or None),
-            'comments': comments,
+            'comments': comments_page(request, pk),
         },
     )
 
 
+@query_budget(5)
+@condition(
+    etag_func=conditions.post_etag,
+    last_modified_func=conditions.post_last_modified,
+)
+def post_comments(request: HttpRequest, pk: int) -> HttpResponse:
+    """Отдаёт HTML следующей порции комментариев для «Показать ещё».
+
+    Args:
+        request: Запрос с курсором порции в параметре `cursor`.
+        pk: Идентификатор поста.
+
+    Returns:
+        HTML-фрагмент с комментариями и ссылкой на следующую порцию.
+    """
+    return render(
+        request,
+        'posts/includes/comment_list.html',
+        {
+            'post_id': pk,
+            'comments': comments_page(request, pk),
+        },
+    )
+
+
+@query_budget(6)
+def post_search(request: HttpRequest) -> HttpResponse:
+    """Создаёт страницу поиска записей по тексту.
+
+    Args:
+        request: Запрос с искомой строкой в параметре `q`.
+
+    Returns:
+        HTML-код страницы с найденными записями по убыванию релевантности.
+    """
+    query = request.GET.get('q', '').strip()
+    page = CachedCountPaginator(
+        search.search_posts(query),
+        settings.PAGINATION,
+    ).get_page(request.GET.get('page'))
+    page.object_list = search.add_snippets(page.object_list, query)
+    return render(
+        request,
+        'posts/search.html',
+        {
+            'query': query,
+            'page_obj': page,
+        },
+    )
+
+
+@query_budget(16)
 @login_required
 def post_create(request: HttpRequest) -> HttpResponse:
     """Создаёт страницу создания новой записи.
@@ -126,6 +288,7 @@ def post_create(request: HttpRequest) -> HttpResponse:
     return redirect('posts:profile', request.user)
 
 
+@query_budget(10)
 @login_required
 def post_delete(request: HttpRequest, pk: int) -> HttpResponse:
     """Удаляет запись из БД.
@@ -140,11 +303,11 @@ def post_delete(request: HttpRequest, pk: int) -> HttpResponse:
     post = get_object_or_404(Post, pk=pk)
     if post.author != request.user:
         return redirect('posts:post_detail', post.pk)
-    post.image.delete()
     post.delete()
     return redirect('posts:index')
 
 
+@query_budget(18)
 @login_required
 def post_edit(request: HttpRequest, pk: int) -> HttpResponse:
     """Создаёт страницу редактирования записи.
@@ -173,6 +336,7 @@ def post_edit(request: HttpRequest, pk: int) -> HttpResponse:
     return redirect('posts:post_detail', post.pk)
 
 
+@query_budget(6)
 @login_required
 def add_comment(request: HttpRequest, pk: int) -> HttpResponse:
     post = get_object_or_404(Post, pk=pk)
@@ -184,14 +348,11 @@ def add_comment(request: HttpRequest, pk: int) -> HttpResponse:
     return redirect('posts:post_detail', post.pk)
 
 
+@query_budget(7)
 @login_required
 def follow_index(request: HttpRequest) -> HttpResponse:
-    page = paginate(
-        request,
-        Post.objects.filter(
-            author__following__user=request.user,
-        ).select_related('author', 'group'),
-        settings.PAGINATION,
+    page = TimelinePaginator(request.user, settings.PAGINATION).get_page(
+        request.GET.get('cursor'),
     )
     return render(
         request,
@@ -202,6 +363,7 @@ def follow_index(request: HttpRequest) -> HttpResponse:
     )
 
 
+@query_budget(12)
 @login_required
 def profile_follow(request: HttpRequest, username: str) -> HttpResponse:
     if (
@@ -215,11 +377,32 @@ def profile_follow(request: HttpRequest, username: str) -> HttpResponse:
     return redirect('posts:profile', username)
 
 
+@query_budget(9)
 @login_required
 def profile_unfollow(request: HttpRequest, username: str) -> HttpResponse:
     get_object_or_404(
-        Follow,
+        Follow.objects.select_related('user', 'author'),
         user=request.user,
         author__username=username,
     ).delete()
     return redirect('posts:profile', username)
+
+
+@login_required
+@require_safe
+def profile_export(request: HttpRequest) -> StreamingHttpResponse:
+    """Отдаёт ZIP-архив с данными пользователя потоком.
+
+    Архив собирается по мере отправки, поэтому ответ начинается сразу,
+    а память не зависит от числа постов и картинок автора. Бюджета
+    запросов у view нет: запросы выгрузки выполняются уже после выхода
+    из него, при отправке ответа.
+    """
+    response = StreamingHttpResponse(
+        export.export_archive(request.user),
+        content_type='application/zip',
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{request.user.username}.zip"'
+    )
+    return response
@@ -0,0 +1,22 @@
+// Подгружает следующую порцию комментариев вместо перехода по ссылке.
+document.addEventListener('click', (event) => {
+  const link = event.target.closest('.js-more-comments');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.fragment, {credentials: 'same-origin'})
+    .then((response) => {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then((html) => {
+      link.insertAdjacentHTML('afterend', html);
+      link.remove();
+    })
+    .catch(() => {
+      window.location.href = link.href;
+    });
+});
@@ -0,0 +1,28 @@
+// Показывает плашку «Новые записи» над лентой. Сама лента
+// не перерисовывается, пока пользователь не нажмёт на плашку.
+document.addEventListener('DOMContentLoaded', () => {
+  const banner = document.getElementById('new-posts');
+  if (!banner) {
+    return;
+  }
+  const show = (state) => {
+    if (state.count) {
+      banner.textContent = `Новые записи: ${state.count}`;
+      banner.hidden = false;
+    }
+  };
+  // Поток SSE держит воркер сервера, поэтому включается настройкой,
+  // а по умолчанию плашка опрашивает лёгкий JSON.
+  if (banner.dataset.stream && window.EventSource) {
+    const source = new EventSource(banner.dataset.stream);
+    source.onmessage = (event) => show(JSON.parse(event.data));
+    return;
+  }
+  const poll = () => {
+    fetch(banner.dataset.count, {credentials: 'same-origin'})
+      .then((response) => (response.ok ? response.json() : {}))
+      .then(show)
+      .finally(() => setTimeout(poll, banner.dataset.interval * 1000));
+  };
+  setTimeout(poll, banner.dataset.interval * 1000);
+});
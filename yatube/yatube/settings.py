@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'core.apps.CoreConfig',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
@@ -36,6 +37,7 @@ INSTALLED_APPS = [
 # fmt: on
 
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,6 +45,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -72,9 +75,41 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': str(BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(BASE_DIR / 'replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Псевдоним реплики для чтений GET и HEAD. Реплика наполняется командой
+# `sync_replica`, до этого чтения идут в основную базу.
+REPLICA_DATABASE = None
+
+# После записи клиент читает основную базу столько секунд. Окно должно
+# быть больше интервала `sync_replica --interval` вместе со временем
+# копирования, иначе клиент может не увидеть свои изменения: команда
+# отказывается запускаться с интервалом не меньше окна.
+REPLICA_PIN_SECONDS = 5
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
 }
 
+API_BATCH_LIMIT = 100
+
+API_MAX_LIMIT = 100
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': (
@@ -99,14 +134,33 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+BACKGROUND_TASKS_EAGER = False
+
+BACKGROUND_WORKERS = 2
+
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+COMMENTS_PAGINATION = 20
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = path.join(BASE_DIR, 'sent_emails')
 
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
 LANGUAGE_CODE = 'ru'
 
+LIVE_POLL_INTERVAL = 15
+
+# Поток SSE занимает поток сервера на всё время жизни, поэтому включать
+# его стоит только за асинхронным или многопоточным сервером. Иначе
+# несколько открытых вкладок займут все синхронные воркеры.
+LIVE_STREAM_ENABLED = False
+
+LIVE_STREAM_SECONDS = 60
+
 LOGIN_REDIRECT_URL = 'posts:index'
 
 LOGIN_URL = 'users:login'
@@ -115,14 +169,47 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+NEW_POSTS_LIMIT = 100
+
 THUMBNAIL_DEBUG = True
 
 PAGINATION = 10
 
+POST_IMAGE_MAX_SIDE = 2048
+
+POST_IMAGE_SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'WEBP': {'quality': 80},
+}
+
+POST_IMAGE_WIDTHS = (480, 960, 1440)
+
+POST_THUMBNAIL_GEOMETRY = '960x339'
+
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+PAGINATION_COUNT_TIMEOUT = 60 * 60
+
+PAGINATION_WINDOW = 2
+
+QUERY_BUDGET = 20
+
+QUERY_BUDGET_ENABLED = DEBUG
+
+QUERY_BUDGET_STRICT = False
+
+QUERY_REPEAT_LIMIT = 3
+
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (BASE_DIR / 'static',)
 
+SYNDICATION_ITEMS = 20
+
+TIMELINE_BACKFILL = 1000
+
+TIMELINE_FANOUT_LIMIT = 10000
+
 TIME_ZONE = 'UTC'
 
 TRUNCATION = 20
@@ -133,6 +220,11 @@ USE_TZ = True
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache_backend.SQLiteCache',
+        'LOCATION': str(BASE_DIR / 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+            'MAX_SIZE': 256 * 1024 * 1024,
+        },
     },
 }
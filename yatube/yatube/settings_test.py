@@ -0,0 +1,12 @@
+from yatube.settings import *  # noqa: F401,F403
+
+BACKGROUND_TASKS_EAGER = True
+
+QUERY_BUDGET_STRICT = True
+
+# Файловый кэш переживает перезапуск тестов, а база тестов - нет.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
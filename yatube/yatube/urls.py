@@ -24,6 +24,13 @@ urlpatterns = [
         ),
     ),
     path('admin/', admin.site.urls),
+    path(
+        'api/',
+        include(
+            'api.urls',
+            namespace=apps.get_app_config('api').name,
+        ),
+    ),
     path(
         'auth/',
         include(